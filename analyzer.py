@@ -1,251 +1,1027 @@
 import asyncio
 from mcp.server.fastmcp import FastMCP
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from array import array
+from collections import Counter, OrderedDict
+import hashlib
 import json
+import os
+import re
+from functools import lru_cache
+from itertools import compress
+
+from log_parallel import aggregate_worker, map_chunks, suggest_worker, use_parallel
+from log_index import MISSING_TIME, LogIndex, parse_timestamp
+from log_stream import CHUNK_SIZE, iter_log_file
+from metrics import METRICS, instrumented
+from stack_traces import TraceGroups
 
 mcp = FastMCP("LogAnalyzer")
 
 def safe_str(value: Any) -> str:
     return str(value) if value is not None else ""
 
+def extract_issue(log: Dict) -> Optional[Tuple[str, Dict]]:
+    """
+    Classify a single log entry.
+
+    Returns ("errors", entry) or ("warnings", entry) with the fields reported by
+    analyze_logs, or None for entries of any other level.
+    """
+    level = safe_str(log.get("level")).upper()
+    if level == "ERROR":
+        return "errors", {
+            "timestamp": safe_str(log.get("timestamp")),
+            "component": safe_str(log.get("component")),
+            "message": safe_str(log.get("message")),
+            "stack_trace": safe_str(log.get("stack_trace"))
+        }
+    elif level == "WARNING":
+        return "warnings", {
+            "timestamp": safe_str(log.get("timestamp")),
+            "component": safe_str(log.get("component")),
+            "message": safe_str(log.get("message"))
+        }
+    return None
+
+
+# Variable parts of a message that are replaced by a placeholder when computing
+# its fingerprint, tried left to right at each position. Numbers (with any unit
+# suffix, "559ms") and ID-like tokens share one placeholder, since the same field
+# of a message can hold either: an ID may be all digits, hex digits only, or mixed.
+# <num> tokens are whole alphanumeric runs ("_" separates them, as in
+# "daily_report_3f2a"): digit-led runs, 0x values, runs of 8+ hex digits and
+# letter-led runs of 6+ that contain a digit. Short codes such as "E1001" stay.
+_VARIABLE_PARTS = re.compile(
+    r"(?P<ts>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)"
+    r"|(?P<uuid>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)"
+    r"|(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b)"
+    r"|(?P<num>(?<![A-Za-z0-9])"
+    r"(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?[A-Za-z0-9]*|[0-9a-fA-F]{8,}|(?=[A-Za-z0-9]*\d)[A-Za-z][A-Za-z0-9]{5,})"
+    r"(?![A-Za-z0-9]))"
+)
+
+MAX_SAMPLES = 3
+
+ISSUE_LEVELS = {"errors": "ERROR", "warnings": "WARNING"}
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(message: str) -> str:
+    """
+    Normalize a log message so that occurrences of the same problem compare equal.
+
+    Timestamps, UUIDs and IP addresses are replaced by ``<ts>``, ``<uuid>`` and
+    ``<ip>``; numbers, numbers with a unit, hex values and alphanumeric IDs by ``<num>``.
+    """
+    return " ".join(_VARIABLE_PARTS.sub(lambda m: f"<{m.lastgroup}>", message).split())
+
+
+class IssueAggregator:
+    """
+    Groups errors and warnings by message fingerprint and component, and errors
+    also by the top-frame signature of their stack trace.
+
+    Memory and output size grow with the number of distinct problems rather than
+    the number of log entries. Groups keep their first-occurrence order.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.total_logs = 0
+        self.counts = {"errors": 0, "warnings": 0}
+        self.groups = {"errors": {}, "warnings": {}}
+        self.traces = TraceGroups()
+
+    def add(self, log: Dict) -> None:
+        self.total_logs += 1
+        issue = extract_issue(log)
+        if issue is not None:
+            self.add_issue(*issue)
+
+    def add_issue(self, kind: str, entry: Dict) -> None:
+        self.counts[kind] += 1
+        if kind == "errors":
+            self.traces.add(entry["stack_trace"], entry["component"])
+        key = (fingerprint(entry["message"]), entry["component"])
+        group = self.groups[kind].get(key)
+        timestamp = entry["timestamp"]
+        if group is None:
+            self.groups[kind][key] = {
+                "fingerprint": key[0],
+                "component": entry["component"],
+                "message": entry["message"],
+                "count": 1,
+                "first_seen": timestamp,
+                "last_seen": timestamp,
+                "samples": [entry]
+            }
+            return
+        group["count"] += 1
+        if timestamp:
+            if not group["first_seen"] or timestamp < group["first_seen"]:
+                group["first_seen"] = timestamp
+            if timestamp > group["last_seen"]:
+                group["last_seen"] = timestamp
+        if len(group["samples"]) < self.max_samples:
+            group["samples"].append(entry)
+
+    def state(self) -> Tuple[int, Dict, Dict, Dict]:
+        """
+        Plain-data snapshot of the aggregator, cheap to send between processes.
+        """
+        return self.total_logs, self.counts, self.groups, self.traces.groups
+
+    def merge(self, state: Tuple[int, Dict, Dict, Dict]) -> None:
+        """
+        Fold in the state of an aggregator that saw the entries following ours.
+
+        Merging chunk states in input order yields the same groups, group order
+        and samples as aggregating the whole input serially.
+        """
+        total_logs, counts, groups, traces = state
+        self.total_logs += total_logs
+        self.traces.merge(traces)
+        for kind in ("errors", "warnings"):
+            self.counts[kind] += counts[kind]
+            mine = self.groups[kind]
+            for key, other in groups[kind].items():
+                group = mine.get(key)
+                if group is None:
+                    mine[key] = dict(other, samples=list(other["samples"]))
+                    continue
+                group["count"] += other["count"]
+                if other["first_seen"] and (not group["first_seen"] or other["first_seen"] < group["first_seen"]):
+                    group["first_seen"] = other["first_seen"]
+                if other["last_seen"] > group["last_seen"]:
+                    group["last_seen"] = other["last_seen"]
+                group["samples"].extend(other["samples"][:self.max_samples - len(group["samples"])])
+
+    def summary(self) -> Dict:
+        return {
+            "total_logs": self.total_logs,
+            "error_count": self.counts["errors"],
+            "warning_count": self.counts["warnings"],
+            "distinct_errors": len(self.groups["errors"]),
+            "distinct_warnings": len(self.groups["warnings"])
+        }
+
+    def result(self) -> Dict:
+        return {
+            "summary": self.summary(),
+            "errors": list(self.groups["errors"].values()),
+            "warnings": list(self.groups["warnings"].values()),
+            "stack_traces": self.traces.result()
+        }
+
+
+# Fields of a log entry kept by LogBatch, each interned into its own string table.
+BATCH_FIELDS = ("level", "component", "message", "timestamp", "stack_trace")
+
+
+def _interner(table: List[str], codes: Dict[str, int]):
+    def code(value: str) -> int:
+        found = codes.get(value)
+        if found is None:
+            found = codes[value] = len(table)
+            table.append(value)
+        return found
+    return code
+
+
+class LogBatch:
+    """
+    Columnar representation of a batch of log entries.
+
+    Every field is interned into a string table and each entry is stored as one
+    unsigned int code per field in array-backed columns, so an entry costs about
+    20 bytes plus whatever text is new to the batch, instead of a dict of five
+    strings. Message and stack trace text is only kept for errors and warnings,
+    the only entries whose text the analyzer reports. Errors and warnings are
+    selected by comparing level codes, each distinct message is fingerprinted
+    once, and the dicts of the analyze_logs output are only built for the groups
+    and pages that are asked for.
+    """
+
+    def __init__(self, logs: Iterable[Dict] = (), max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.tables: Dict[str, List[str]] = {field: [] for field in BATCH_FIELDS}
+        self.columns: Dict[str, array] = {field: array("I") for field in BATCH_FIELDS}
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in BATCH_FIELDS}
+        self._fingerprints: Dict[int, str] = {}
+        self._groups: Dict[str, Dict] = {}
+        self._traces: Optional[TraceGroups] = None
+        self._epochs: Optional[array] = None
+        self.extend(logs)
+
+    def __len__(self) -> int:
+        return len(self.columns["level"])
+
+    def extend(self, logs: Iterable[Dict]) -> None:
+        """Append entries, e.g. straight from iter_log_file without keeping the dicts."""
+        levels, components, messages, timestamps, stack_traces = (self.columns[field] for field in BATCH_FIELDS)
+        level_code, component_code, message_code, timestamp_code, stack_trace_code = (
+            _interner(self.tables[field], self._codes[field]) for field in BATCH_FIELDS
+        )
+        issue_levels = {level_code(level) for level in ISSUE_LEVELS.values()}
+        empty = message_code(""), stack_trace_code("")
+        # Most entries repeat a known level, component and timestamp, so look the raw
+        # string up first and only normalize values that miss (tables hold normalized text)
+        level_codes, component_codes, timestamp_codes = (self._codes[field] for field in ("level", "component", "timestamp"))
+        for log in logs:
+            get = log.get
+            value = get("level")
+            level = level_codes.get(value) if value.__class__ is str else None
+            if level is None:
+                level = level_code(safe_str(value).upper())
+            levels.append(level)
+            value = get("component")
+            code = component_codes.get(value) if value.__class__ is str else None
+            components.append(component_code(safe_str(value)) if code is None else code)
+            value = get("timestamp")
+            code = timestamp_codes.get(value) if value.__class__ is str else None
+            timestamps.append(timestamp_code(safe_str(value)) if code is None else code)
+            if level in issue_levels:
+                messages.append(message_code(safe_str(get("message"))))
+                stack_traces.append(stack_trace_code(safe_str(get("stack_trace"))))
+            else:
+                messages.append(empty[0])
+                stack_traces.append(empty[1])
+        self._groups.clear()
+        self._traces = None
+        self._epochs = None
+
+    def indices(self, level: str) -> List[int]:
+        """Positions of the entries with the given (upper case) level."""
+        code = self._codes["level"].get(level)
+        if code is None:
+            return []
+        return list(compress(range(len(self)), map(code.__eq__, self.columns["level"])))
+
+    def count(self, level: str) -> int:
+        code = self._codes["level"].get(level)
+        return 0 if code is None else self.columns["level"].count(code)
+
+    def epochs(self) -> array:
+        """
+        Timestamps as an int64 column of epoch seconds, MISSING_TIME where unparseable.
+
+        Each distinct timestamp string is parsed once; the column is cached until
+        the batch is extended.
+        """
+        if self._epochs is None:
+            parsed = (parse_timestamp(value) for value in self.tables["timestamp"])
+            table = array("q", (MISSING_TIME if seconds is None else seconds for seconds in parsed))
+            self._epochs = array("q", map(table.__getitem__, self.columns["timestamp"]))
+        return self._epochs
+
+    def entry(self, index: int, kind: str) -> Dict:
+        """The analyze_logs dict of the issue at ``index``."""
+        tables, columns = self.tables, self.columns
+        entry = {
+            "timestamp": tables["timestamp"][columns["timestamp"][index]],
+            "component": tables["component"][columns["component"][index]],
+            "message": tables["message"][columns["message"][index]]
+        }
+        if kind == "errors":
+            entry["stack_trace"] = tables["stack_trace"][columns["stack_trace"][index]]
+        return entry
+
+    def issues(self, kind: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Lazily yield the issue dicts of one kind in input order."""
+        indices = self.indices(ISSUE_LEVELS[kind])
+        stop = None if limit is None else offset + limit
+        for index in indices[offset:stop]:
+            yield self.entry(index, kind)
+
+    def _group(self, kind: str) -> Dict[Tuple[str, int], list]:
+        """
+        Group one kind by (fingerprint, component code) as [count, first_seen, last_seen, sample indices].
+
+        Same rules as IssueAggregator.add_issue, computed over codes. The result is
+        only cached once complete: batches are shared between threads (Streamlit
+        sessions, asyncio.to_thread), which may race to build it but never read it half-built.
+        """
+        groups = self._groups.get(kind)
+        if groups is not None:
+            return groups
+        groups = {}
+        fingerprints = self._fingerprints
+        message_table = self.tables["message"]
+        timestamp_table = self.tables["timestamp"]
+        components, messages, timestamps = self.columns["component"], self.columns["message"], self.columns["timestamp"]
+        max_samples = self.max_samples
+
+        for index in self.indices(ISSUE_LEVELS[kind]):
+            message = messages[index]
+            message_fingerprint = fingerprints.get(message)
+            if message_fingerprint is None:
+                message_fingerprint = fingerprints[message] = fingerprint(message_table[message])
+            key = (message_fingerprint, components[index])
+            timestamp = timestamp_table[timestamps[index]]
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, timestamp, timestamp, [index]]
+                continue
+            group[0] += 1
+            if timestamp:
+                if not group[1] or timestamp < group[1]:
+                    group[1] = timestamp
+                if timestamp > group[2]:
+                    group[2] = timestamp
+            if len(group[3]) < max_samples:
+                group[3].append(index)
+        self._groups[kind] = groups
+        return groups
+
+    def _group_dict(self, kind: str, key: Tuple[str, int], group: list) -> Dict:
+        message_fingerprint, component = key
+        count, first_seen, last_seen, samples = group
+        entries = [self.entry(index, kind) for index in samples]
+        return {
+            "fingerprint": message_fingerprint,
+            "component": self.tables["component"][component],
+            "message": entries[0]["message"],
+            "count": count,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+            "samples": entries
+        }
+
+    def groups(self, kind: str) -> Iterator[Dict]:
+        """Lazily yield the issue groups of one kind in the IssueAggregator format."""
+        for key, group in self._group(kind).items():
+            yield self._group_dict(kind, key, group)
+
+    def ranked_groups(self, kind: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """A page of the issue groups of one kind, largest count first, then in order of first occurrence."""
+        ranked = sorted(self._group(kind).items(), key=lambda item: -item[1][0])
+        stop = None if limit is None else offset + limit
+        return [self._group_dict(kind, key, group) for key, group in ranked[offset:stop]]
+
+    def trace_groups(self) -> TraceGroups:
+        """
+        Errors grouped by stack trace signature, as in IssueAggregator.
+
+        Each distinct (stack trace, component) pair is parsed and added once with its
+        count. Like the issue groups, the result is cached only once complete.
+        """
+        traces = self._traces
+        if traces is None:
+            traces = TraceGroups()
+            trace_table, component_table = self.tables["stack_trace"], self.tables["component"]
+            stack_traces, components = self.columns["stack_trace"], self.columns["component"]
+            indices = self.indices("ERROR")
+            pairs = Counter(zip(map(stack_traces.__getitem__, indices), map(components.__getitem__, indices)))
+            for (trace, component), count in pairs.items():
+                traces.add(trace_table[trace], component_table[component], count)
+            self._traces = traces
+        return traces
+
+    def summary(self) -> Dict:
+        return {
+            "total_logs": len(self),
+            "error_count": self.count("ERROR"),
+            "warning_count": self.count("WARNING"),
+            "distinct_errors": len(self._group("errors")),
+            "distinct_warnings": len(self._group("warnings"))
+        }
+
+    def state(self) -> Tuple[int, Dict, Dict, Dict]:
+        """Same plain-data snapshot as IssueAggregator.state, for merging chunk results."""
+        groups = {kind: {(group["fingerprint"], group["component"]): group for group in self.groups(kind)}
+                  for kind in ("errors", "warnings")}
+        counts = {"errors": self.count("ERROR"), "warnings": self.count("WARNING")}
+        return len(self), counts, groups, self.trace_groups().groups
+
+    def result(self) -> Dict:
+        return {
+            "summary": self.summary(),
+            "errors": list(self.groups("errors")),
+            "warnings": list(self.groups("warnings")),
+            "stack_traces": self.trace_groups().result()
+        }
+
+
 @mcp.tool()
-def analyze_logs(logs: List[Dict]) -> Dict:
+@instrumented
+def analyze_logs(logs: List[Dict], parallel: bool = False) -> Dict:
     """
     Analyze log entries to extract errors and warnings.
+
+    Errors and warnings are grouped by message fingerprint (the message with
+    numbers, IDs, hex values and timestamps stripped) and component. Each group
+    reports its count, first and last seen timestamps and a few sample entries.
+    Errors with a Java, Python or .NET stack trace are also grouped under
+    "stack_traces" by exception type, top frames and root cause.
+
+    Args:
+        logs (List[Dict]): Log entries to analyze.
+        parallel (bool): Split large batches into chunks analyzed on all CPU cores.
+            Batches below the configured threshold are still analyzed serially.
+    """
+    METRICS.count("entries", len(logs), tool="analyze_logs")
+    if not (parallel and use_parallel(len(logs))):
+        return LogBatch(logs).result()
+    aggregator = IssueAggregator()
+    for state in map_chunks(aggregate_worker, logs):
+        aggregator.merge(state)
+    return aggregator.result()
+
+
+# Log files analyzed by analyze_log_file, keyed by handle, least recently used first.
+# Each holds the path, the summary, the file's columnar LogBatch (pages of issues are
+# served from it) and, once queried, its time index; only the most recent
+# MAX_LOG_FILES are kept.
+MAX_LOG_FILES = int(os.getenv("LOG_ANALYZER_MAX_LOG_FILES", "8"))
+_LOG_FILES: "OrderedDict[str, Dict]" = OrderedDict()
+
+
+def _log_file_handle(path: str) -> str:
+    stat = os.stat(path)
+    key = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _get_log_file(handle: str) -> Dict:
+    if handle not in _LOG_FILES:
+        raise ValueError(f"Unknown log file handle: {handle}. Call analyze_log_file first.")
+    log_file = _LOG_FILES[handle]
+    # The handle hashes the file's size and mtime, so it no longer matches once the file changes
+    try:
+        current = _log_file_handle(log_file["path"])
+    except OSError:
+        current = None
+    if current != handle:
+        del _LOG_FILES[handle]
+        raise ValueError(f"Log file {log_file['path']} changed or was removed since it was analyzed. "
+                         "Call analyze_log_file again.")
+    _LOG_FILES.move_to_end(handle)
+    return log_file
+
+
+def _add_log_file(handle: str, log_file: Dict) -> None:
+    _LOG_FILES[handle] = log_file
+    _LOG_FILES.move_to_end(handle)
+    while len(_LOG_FILES) > MAX_LOG_FILES:
+        _LOG_FILES.popitem(last=False)
+
+
+@mcp.tool()
+@instrumented
+def analyze_log_file(path: str, top_n: int = 10) -> Dict:
+    """
+    Analyze a JSON-array or NDJSON log file on local disk, streaming it into a columnar LogBatch.
+
+    Args:
+        path (str): Path of the log file on the machine running this server.
+        top_n (int): Number of the largest error, warning and stack trace groups to include.
+
+    Returns:
+        A handle for the file, the summary, the top_n largest groups of each kind
+        and how many groups were omitted. Use get_log_file_groups with the handle
+        for the remaining groups and get_log_file_issues for the individual
+        entries, page by page.
     """
-    errors = []
-    warnings = []
-
-    for log in logs:
-        level = safe_str(log.get("level")).upper()
-        if level == "ERROR":
-            errors.append({
-                "timestamp": safe_str(log.get("timestamp")),
-                "component": safe_str(log.get("component")),
-                "message": safe_str(log.get("message")),
-                "stack_trace": safe_str(log.get("stack_trace"))
-            })
-        elif level == "WARNING":
-            warnings.append({
-                "timestamp": safe_str(log.get("timestamp")),
-                "component": safe_str(log.get("component")),
-                "message": safe_str(log.get("message"))
-            })
-
-    result = {
-        "summary": {
-            "total_logs": len(logs),
-            "error_count": len(errors),
-            "warning_count": len(warnings)
-        },
-        "errors": errors,
-        "warnings": warnings
+    path = os.path.abspath(path)
+    batch = LogBatch(iter_log_file(path))
+
+    handle = _log_file_handle(path)
+    summary = batch.summary()
+    _add_log_file(handle, {"path": path, "summary": summary, "batch": batch})
+    top_n = max(top_n, 0)
+    stack_traces = batch.trace_groups().result()
+    return {
+        "handle": handle,
+        "path": path,
+        "summary": summary,
+        "errors": batch.ranked_groups("errors", 0, top_n),
+        "warnings": batch.ranked_groups("warnings", 0, top_n),
+        "stack_traces": stack_traces[:top_n],
+        "omitted": {
+            "errors": max(summary["distinct_errors"] - top_n, 0),
+            "warnings": max(summary["distinct_warnings"] - top_n, 0),
+            "stack_traces": max(len(stack_traces) - top_n, 0)
+        }
     }
-    return result
 
 
 @mcp.tool()
-def suggest_fix(errors_and_warnings: Dict) -> List[str]:
+@instrumented
+def get_log_file_groups(handle: str, kind: str = "errors", offset: int = 0, limit: int = 50) -> Dict:
     """
-    Suggest potential fixes for each issue based on the log message content.
+    Fetch a page of the grouped errors, warnings or stack traces of a file analyzed by analyze_log_file.
 
     Args:
-        errors_and_warnings (Dict): Dictionary containing analyzed errors and warnings.
+        handle (str): Handle returned by analyze_log_file.
+        kind (str): "errors", "warnings" or "stack_traces".
+        offset (int): Number of groups to skip, largest first.
+        limit (int): Maximum number of groups to return.
 
     Returns:
-        List of textual suges or actions to take for each issue.
+        A dictionary in the analyze_logs format holding only the requested page of
+        groups, which can be passed directly to suggest_fix.
     """
-    suges = []
+    log_file = _get_log_file(handle)
+    kind = safe_str(kind).lower()
+    offset, limit = max(offset, 0), max(limit, 0)
+    batch = log_file["batch"]
+    if kind == "stack_traces":
+        page = batch.trace_groups().result()[offset:offset + limit]
+    elif kind in ISSUE_LEVELS:
+        page = batch.ranked_groups(kind, offset, limit)
+    else:
+        raise ValueError(f"Unsupported kind: {kind}. Use errors, warnings or stack_traces.")
 
-    # Process ERROR level issues
-    for error in errors_and_warnings.get("errors", []):
-        msg = safe_str(error.get("message")).lower()
-        component = safe_str(error.get("component")).lower()
-        stack_trace = safe_str(error.get("stack_trace")).lower()
-
-        # Database-related errors
-        if any(keyword in msg for keyword in ["database", "connection timeout", "deadlock", "sql"]):
-            if "timeout" in msg:
-                suges.append(
-                    "🔧 Database: Increase connection timeout, optimize slow queries, and check network connectivity between application and database server.")
-            elif "deadlock" in msg:
-                suges.append(
-                    "🔧 Database: Review transaction isolation levels, minimize transaction duration, and implement proper lock ordering to prevent deadlocks.")
-            elif "pool" in msg and ("exhausted" in msg or "running low" in msg):
-                suges.append(
-                    "🔧 Database: Increase connection pool size, implement connection pooling best practices, and monitor connection leaks.")
-
-        # Memory-related errors
-        elif any(keyword in msg for keyword in ["outofmemoryerror", "heap space", "memory"]):
-            if "heap space" in msg:
-                suges.append(
-                    "🔧 Memory: Increase JVM heap size (-Xmx), optimize memory usage in DataProcessor, and implement memory profiling to identify leaks.")
-            elif "outofmemory" in msg:
-                suges.append(
-                    "🔧 Memory: Monitor memory usage patterns, implement garbage collection tuning, and consider using memory-efficient data structures.")
-
-        # Authentication errors
-        elif any(keyword in msg for keyword in ["nullpointer", "authentication", "oauth", "ldap", "token"]):
-            if "nullpointer" in msg:
-                suges.append(
-                    "🔧 Authentication: Add comprehensive null checks in AuthService, implement proper error handling, and validate input parameters before processing.")
-            elif "token expired" in msg or "oauth" in msg:
-                suges.append(
-                    "🔧 Authentication: Implement automatic token refresh mechanism, add token expiry validation, and configure proper token lifetime management.")
-            elif "ldap" in msg:
-                suges.append(
-                    "🔧 Authentication: Check LDAP server connectivity, verify credentials, implement connection retry logic, and add fallback authentication methods.")
-
-        # Network and timeout errors
-        elif any(keyword in msg for keyword in ["timeout", "ssl", "connection", "network"]):
-            if "timeout" in msg:
-                if "payment" in msg or "gateway" in msg:
-                    suges.append(
-                        "🔧 Network: Increase PaymentGateway timeout settings, implement circuit breaker pattern, and add retry logic with exponential backoff.")
-                else:
-                    suges.append(
-                        "🔧 Network: Check network connectivity, increase timeout values, implement connection pooling, and add health checks for external services.")
-            elif "ssl" in msg:
-                suges.append(
-                    "🔧 Network: Verify SSL certificates, update certificate trust store, check TLS version compatibility, and implement proper SSL configuration.")
-
-        # File and configuration errors
-        elif any(keyword in msg for keyword in ["filenotfound", "config", "properties"]):
-            suges.append(
-                "🔧 Configuration: Verify file paths, ensure configuration files exist, implement configuration validation, and add default fallback configurations.")
-
-        # Cache and Redis errors
-        elif any(keyword in msg for keyword in ["redis", "cache", "pool exhausted"]):
-            if "pool exhausted" in msg:
-                suges.append(
-                    "🔧 Cache: Increase Redis connection pool size, implement connection management, monitor cache hit ratios, and add connection health checks.")
-
-        # External service errors
-        elif any(keyword in msg for keyword in ["elasticsearch", "kafka", "service discovery"]):
-            if "elasticsearch" in msg:
-                suges.append(
-                    "🔧 External Services: Check Elasticsearch cluster health, verify connectivity, implement retry mechanisms, and add service monitoring.")
-            elif "kafka" in msg:
-                suges.append(
-                    "🔧 External Services: Verify Kafka broker connectivity, check network configuration, implement producer/consumer error handling.")
-            elif "service discovery" in msg:
-                suges.append(
-                    "🔧 External Services: Check service registry health, implement service discovery fallbacks, and verify network connectivity to registry.")
-
-        # Threading and execution errors
-        elif any(keyword in msg for keyword in ["thread", "rejected execution", "circuit breaker"]):
-            if "rejected execution" in msg:
-                suges.append(
-                    "🔧 Threading: Increase thread pool size, implement proper task queuing, monitor thread pool metrics, and add backpressure handling.")
-            elif "circuit breaker" in msg:
-                suges.append(
-                    "🔧 Resilience: Review circuit breaker thresholds, implement proper fallback mechanisms, and monitor service health metrics.")
-
-        # Serialization and data format errors
-        elif any(keyword in msg for keyword in ["json", "serialization", "parsing"]):
-            if "json" in msg:
-                suges.append(
-                    "🔧 Data Processing: Implement robust JSON validation, add proper error handling for malformed data, and use schema validation.")
-            elif "serialization" in msg:
-                suges.append(
-                    "🔧 Data Processing: Ensure all objects implement Serializable, review serialization compatibility, and consider using alternative serialization formats.")
-
-        # Validation and constraint errors
-        elif any(keyword in msg for keyword in ["validation", "constraint", "integrity"]):
-            suges.append(
-                "🔧 Data Validation: Implement comprehensive input validation, review database constraints, and add proper error handling for validation failures.")
+    return {
+        "handle": handle,
+        "summary": log_file["summary"],
+        "offset": offset,
+        kind: page
+    }
 
-        # Container and deployment errors
-        elif any(keyword in msg for keyword in ["docker", "container"]):
-            suges.append(
-                "🔧 Deployment: Check Docker configuration, verify resource limits, review container logs, and ensure proper image dependencies.")
 
-        # WebSocket and real-time communication errors
-        elif any(keyword in msg for keyword in ["websocket", "broken pipe"]):
-            suges.append(
-                "🔧 Real-time Communication: Implement WebSocket reconnection logic, add connection health monitoring, and handle network interruptions gracefully.")
+@mcp.tool()
+@instrumented
+def get_log_file_issues(handle: str, level: str = "ERROR", offset: int = 0, limit: int = 50) -> Dict:
+    """
+    Fetch a page of errors or warnings from a file analyzed by analyze_log_file.
 
-        # GraphQL and API errors
-        elif any(keyword in msg for keyword in ["graphql", "query execution"]):
-            suges.append(
-                "🔧 API: Optimize GraphQL query performance, implement query complexity analysis, add proper timeout handling, and monitor query execution times.")
+    Args:
+        handle (str): Handle returned by analyze_log_file.
+        level (str): "ERROR" or "WARNING".
+        offset (int): Number of matching issues to skip.
+        limit (int): Maximum number of issues to return.
 
-        # Batch processing errors
-        elif any(keyword in msg for keyword in ["batch", "job failed"]):
-            suges.append(
-                "🔧 Batch Processing: Implement proper error handling in batch jobs, add data validation, implement retry mechanisms, and monitor job execution status.")
+    Returns:
+        A dictionary in the analyze_logs format holding only the requested page,
+        which can be passed directly to suggest_fix.
+    """
+    log_file = _get_log_file(handle)
+    key = {"ERROR": "errors", "WARNING": "warnings"}.get(safe_str(level).upper())
+    if key is None:
+        raise ValueError(f"Unsupported level: {level}. Use ERROR or WARNING.")
 
-        # Lock and concurrency errors
-        elif any(keyword in msg for keyword in ["lock", "distributed lock"]):
-            suges.append(
-                "🔧 Concurrency: Review lock timeout settings, implement proper lock release mechanisms, add lock monitoring, and consider lock-free alternatives where possible.")
+    page = list(log_file["batch"].issues(key, max(offset, 0), max(limit, 0)))
+    return {
+        "handle": handle,
+        "summary": log_file["summary"],
+        "offset": offset,
+        key: page
+    }
 
-        # Cloud service errors (AWS, etc.)
-        elif any(keyword in msg for keyword in ["s3", "access denied", "aws"]):
-            suges.append(
-                "🔧 Cloud Services: Verify IAM permissions, check AWS credentials, review bucket policies, and implement proper error handling for cloud service failures.")
 
-        # Generic error handling
-        else:
-            suges.append(
-                f"🔧 General: Review {component} component logs, implement proper error handling, add monitoring and alerting for this error type.")
+@mcp.tool()
+@instrumented
+def query_log_window(handle: str, start: str = "", end: str = "", component: str = "", level: str = "ERROR",
+                     top_n: int = 5, bucket_minutes: int = 1) -> Dict:
+    """
+    Query a time window of a file analyzed by analyze_log_file without rescanning it.
 
-    # Process WARNING level issues
-    for warning in errors_and_warnings.get("warnings", []):
-        msg = safe_str(warning.get("message")).lower()
-        component = safe_str(warning.get("component")).lower()
+    Args:
+        handle (str): Handle returned by analyze_log_file.
+        start (str): ISO 8601 start of the window (inclusive); defaults to the first entry.
+        end (str): ISO 8601 end of the window (exclusive, after start); defaults to just after the last entry.
+        component (str): Restrict counts and histogram to one component.
+        level (str): Level used to rank the top components, e.g. "ERROR" or "WARNING".
+        top_n (int): Number of top components to return.
+        bucket_minutes (int): Width of the histogram buckets in minutes.
 
-        # System resource warnings
-        if any(keyword in msg for keyword in ["disk usage", "disk"]):
-            suges.append(
-                "💡 System Resources: Set up automated log rotation, clean old temporary files, monitor disk usage proactively, and implement disk space alerts.")
-        elif any(keyword in msg for keyword in ["memory usage", "memory"]):
-            suges.append(
-                "💡 System Resources: Monitor memory usage patterns, implement memory optimization, consider increasing available memory, and add memory usage alerts.")
-        elif any(keyword in msg for keyword in ["cpu usage", "cpu"]):
-            suges.append(
-                "💡 System Resources: Optimize CPU-intensive operations, implement load balancing, monitor CPU usage trends, and consider scaling resources.")
+    Returns:
+        Entry, error and warning counts in the window, the same counts for the
+        preceding window of equal length with the rate of change, the top components
+        and a histogram of the non-empty buckets.
+    """
+    log_file = _get_log_file(handle)
+    index = log_file.get("index")
+    if index is None:
+        index = log_file["index"] = LogIndex.from_batch(log_file["batch"])
 
-        # Performance warnings
-        elif any(keyword in msg for keyword in ["response time", "performance", "degradation"]):
-            suges.append(
-                "💡 Performance: Optimize slow operations, implement caching strategies, review database query performance, and add performance monitoring.")
-        elif any(keyword in msg for keyword in ["latency", "network"]):
-            suges.append(
-                "💡 Performance: Optimize network calls, implement connection pooling, review network infrastructure, and add latency monitoring.")
+    bounds = {}
+    for name, value in (("start", start), ("end", end)):
+        bounds[name] = parse_timestamp(value) if value else None
+        if value and bounds[name] is None:
+            raise ValueError(f"Invalid {name} timestamp: {value}. Use ISO 8601, e.g. 2025-07-26T12:30:00Z.")
 
-        # Queue and throughput warnings
-        elif any(keyword in msg for keyword in ["queue", "limit", "approaching"]):
-            suges.append(
-                "💡 Capacity: Monitor queue sizes, implement auto-scaling, optimize message processing, and add queue depth alerts.")
-        elif any(keyword in msg for keyword in ["rate limit", "requests"]):
-            suges.append(
-                "💡 Capacity: Review rate limiting policies, implement request throttling, consider increasing limits, and add rate limiting alerts.")
+    result = index.query(bounds["start"], bounds["end"], component or None, level, top_n, bucket_minutes)
+    result["handle"] = handle
+    return result
 
-        # Cache performance warnings
-        elif any(keyword in msg for keyword in ["cache", "hit ratio"]):
-            suges.append(
-                "💡 Caching: Optimize cache configuration, review cache key strategies, implement cache warming, and monitor cache performance metrics.")
 
-        # Scheduled task warnings
-        elif any(keyword in msg for keyword in ["scheduled", "task", "delayed"]):
-            suges.append(
-                "💡 Scheduling: Review task scheduling configuration, optimize task execution time, implement task monitoring, and add scheduling alerts.")
+class LogTailer:
+    """
+    Incrementally analyzes a growing NDJSON log file.
 
-        # Garbage collection warnings
-        elif any(keyword in msg for keyword in ["garbage collection", "gc"]):
-            suges.append(
-                "💡 JVM: Tune garbage collection parameters, review heap configuration, implement GC monitoring, and optimize memory allocation patterns.")
+    Each poll reads only the bytes appended since the previous one, classifies the
+    complete lines into a delta aggregator and merges it into the running totals.
+    The file is identified by device and inode, so a rotated or truncated file is
+    picked up again from its start.
+    """
 
-        # Connection pool warnings
-        elif any(keyword in msg for keyword in ["connection pool", "connections available"]):
-            suges.append(
-                "💡 Connection Management: Increase connection pool size, implement connection monitoring, optimize connection usage, and add pool health checks.")
+    def __init__(self, path: str, start_at_end: bool = False, max_samples: int = MAX_SAMPLES):
+        self.path = os.path.abspath(path)
+        self.start_at_end = start_at_end
+        self.aggregator = IssueAggregator(max_samples)
+        self.identity = None
+        self.offset = 0
+        self.pending = b""
+        self.rotations = 0
+        self.invalid_lines = 0
+
+    def poll(self) -> Dict:
+        """
+        Consume newly appended lines and return the issues found in them.
+        """
+        delta = IssueAggregator(self.aggregator.max_samples)
+        read_bytes = 0
+
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            identity = (stat.st_dev, stat.st_ino)
+            if identity != self.identity or stat.st_size < self.offset:
+                if self.identity is None and self.start_at_end:
+                    self.offset = stat.st_size
+                else:
+                    if self.identity is not None:
+                        self.rotations += 1
+                    self.offset = 0
+                self.identity = identity
+                self.pending = b""
 
-        # Generic warning handling
+            f.seek(self.offset)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                read_bytes += len(chunk)
+                lines = (self.pending + chunk).split(b"\n")
+                self.pending = lines.pop()
+                for line in lines:
+                    self._add_line(line, delta)
+            self.offset += read_bytes
+
+        self.aggregator.merge(delta.state())
+        return {
+            "path": self.path,
+            "offset": self.offset,
+            "read_bytes": read_bytes,
+            "rotations": self.rotations,
+            "invalid_lines": self.invalid_lines,
+            "delta": delta.result(),
+            "summary": self.aggregator.summary()
+        }
+
+    def _add_line(self, line: bytes, delta: IssueAggregator) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            log = json.loads(line)
+        except ValueError:
+            self.invalid_lines += 1
+            return
+        if isinstance(log, dict):
+            delta.add(log)
         else:
-            suges.append(
-                f"💡 Monitoring: Monitor {component} component closely, implement alerting for this warning type, and review system metrics regularly.")
+            self.invalid_lines += 1
+
+    def result(self) -> Dict:
+        return self.aggregator.result()
+
+
+# Followed files, keyed by absolute path.
+_TAILERS: Dict[str, LogTailer] = {}
+
+
+@mcp.tool()
+@instrumented
+def tail_log_file(path: str, start_at_end: bool = False) -> Dict:
+    """
+    Follow a growing NDJSON log file and report what changed since the last call.
+
+    The first call for a path reads the file from the start (or, with start_at_end,
+    only remembers its current end). Later calls read just the appended lines.
+
+    Args:
+        path (str): Path of the NDJSON log file on the machine running this server.
+        start_at_end (bool): On the first call, skip the existing content.
+
+    Returns:
+        The grouped errors and warnings found in the new lines ("delta"), the
+        running summary for the whole file, and the current read offset.
+    """
+    path = os.path.abspath(path)
+    tailer = _TAILERS.get(path)
+    if tailer is None:
+        tailer = _TAILERS[path] = LogTailer(path, start_at_end=start_at_end)
+    return tailer.poll()
+
+
+# Suggestion rules, evaluated in order. Each error rule is
+# (category, gate keywords, [(condition, suggestion), ...]); the first rule whose
+# gate keywords appear in the message wins, and within it the first fix whose
+# condition holds is emitted (possibly none). A condition is a list of keyword
+# groups that must all match, where a group matches if any of its keywords is
+# present. Warning rules carry a single unconditional suggestion.
+ERROR_RULES = [
+    ("Database", ["database", "connection timeout", "deadlock", "sql"], [
+        ([["timeout"]],
+         "🔧 Database: Increase connection timeout, optimize slow queries, and check network connectivity between application and database server."),
+        ([["deadlock"]],
+         "🔧 Database: Review transaction isolation levels, minimize transaction duration, and implement proper lock ordering to prevent deadlocks."),
+        ([["pool"], ["exhausted", "running low"]],
+         "🔧 Database: Increase connection pool size, implement connection pooling best practices, and monitor connection leaks."),
+    ]),
+    ("Memory", ["outofmemoryerror", "heap space", "memory"], [
+        ([["heap space"]],
+         "🔧 Memory: Increase JVM heap size (-Xmx), optimize memory usage in DataProcessor, and implement memory profiling to identify leaks."),
+        ([["outofmemory"]],
+         "🔧 Memory: Monitor memory usage patterns, implement garbage collection tuning, and consider using memory-efficient data structures."),
+    ]),
+    ("Authentication", ["nullpointer", "authentication", "oauth", "ldap", "token"], [
+        ([["nullpointer"]],
+         "🔧 Authentication: Add comprehensive null checks in AuthService, implement proper error handling, and validate input parameters before processing."),
+        ([["token expired", "oauth"]],
+         "🔧 Authentication: Implement automatic token refresh mechanism, add token expiry validation, and configure proper token lifetime management."),
+        ([["ldap"]],
+         "🔧 Authentication: Check LDAP server connectivity, verify credentials, implement connection retry logic, and add fallback authentication methods."),
+    ]),
+    ("Network", ["timeout", "ssl", "connection", "network"], [
+        ([["timeout"], ["payment", "gateway"]],
+         "🔧 Network: Increase PaymentGateway timeout settings, implement circuit breaker pattern, and add retry logic with exponential backoff."),
+        ([["timeout"]],
+         "🔧 Network: Check network connectivity, increase timeout values, implement connection pooling, and add health checks for external services."),
+        ([["ssl"]],
+         "🔧 Network: Verify SSL certificates, update certificate trust store, check TLS version compatibility, and implement proper SSL configuration."),
+    ]),
+    ("Configuration", ["filenotfound", "config", "properties"], [
+        ([],
+         "🔧 Configuration: Verify file paths, ensure configuration files exist, implement configuration validation, and add default fallback configurations."),
+    ]),
+    ("Cache", ["redis", "cache", "pool exhausted"], [
+        ([["pool exhausted"]],
+         "🔧 Cache: Increase Redis connection pool size, implement connection management, monitor cache hit ratios, and add connection health checks."),
+    ]),
+    ("External Services", ["elasticsearch", "kafka", "service discovery"], [
+        ([["elasticsearch"]],
+         "🔧 External Services: Check Elasticsearch cluster health, verify connectivity, implement retry mechanisms, and add service monitoring."),
+        ([["kafka"]],
+         "🔧 External Services: Verify Kafka broker connectivity, check network configuration, implement producer/consumer error handling."),
+        ([["service discovery"]],
+         "🔧 External Services: Check service registry health, implement service discovery fallbacks, and verify network connectivity to registry."),
+    ]),
+    ("Threading", ["thread", "rejected execution", "circuit breaker"], [
+        ([["rejected execution"]],
+         "🔧 Threading: Increase thread pool size, implement proper task queuing, monitor thread pool metrics, and add backpressure handling."),
+        ([["circuit breaker"]],
+         "🔧 Resilience: Review circuit breaker thresholds, implement proper fallback mechanisms, and monitor service health metrics."),
+    ]),
+    ("Data Processing", ["json", "serialization", "parsing"], [
+        ([["json"]],
+         "🔧 Data Processing: Implement robust JSON validation, add proper error handling for malformed data, and use schema validation."),
+        ([["serialization"]],
+         "🔧 Data Processing: Ensure all objects implement Serializable, review serialization compatibility, and consider using alternative serialization formats."),
+    ]),
+    ("Data Validation", ["validation", "constraint", "integrity"], [
+        ([],
+         "🔧 Data Validation: Implement comprehensive input validation, review database constraints, and add proper error handling for validation failures."),
+    ]),
+    ("Deployment", ["docker", "container"], [
+        ([],
+         "🔧 Deployment: Check Docker configuration, verify resource limits, review container logs, and ensure proper image dependencies."),
+    ]),
+    ("Real-time Communication", ["websocket", "broken pipe"], [
+        ([],
+         "🔧 Real-time Communication: Implement WebSocket reconnection logic, add connection health monitoring, and handle network interruptions gracefully."),
+    ]),
+    ("API", ["graphql", "query execution"], [
+        ([],
+         "🔧 API: Optimize GraphQL query performance, implement query complexity analysis, add proper timeout handling, and monitor query execution times."),
+    ]),
+    ("Batch Processing", ["batch", "job failed"], [
+        ([],
+         "🔧 Batch Processing: Implement proper error handling in batch jobs, add data validation, implement retry mechanisms, and monitor job execution status."),
+    ]),
+    ("Concurrency", ["lock", "distributed lock"], [
+        ([],
+         "🔧 Concurrency: Review lock timeout settings, implement proper lock release mechanisms, add lock monitoring, and consider lock-free alternatives where possible."),
+    ]),
+    ("Cloud Services", ["s3", "access denied", "aws"], [
+        ([],
+         "🔧 Cloud Services: Verify IAM permissions, check AWS credentials, review bucket policies, and implement proper error handling for cloud service failures."),
+    ]),
+]
+
+ERROR_FALLBACK = ("General",
+                  "🔧 General: Review {component} component logs, implement proper error handling, add monitoring and alerting for this error type.")
+
+WARNING_RULES = [
+    ("System Resources", ["disk usage", "disk"],
+     "💡 System Resources: Set up automated log rotation, clean old temporary files, monitor disk usage proactively, and implement disk space alerts."),
+    ("System Resources", ["memory usage", "memory"],
+     "💡 System Resources: Monitor memory usage patterns, implement memory optimization, consider increasing available memory, and add memory usage alerts."),
+    ("System Resources", ["cpu usage", "cpu"],
+     "💡 System Resources: Optimize CPU-intensive operations, implement load balancing, monitor CPU usage trends, and consider scaling resources."),
+    ("Performance", ["response time", "performance", "degradation"],
+     "💡 Performance: Optimize slow operations, implement caching strategies, review database query performance, and add performance monitoring."),
+    ("Performance", ["latency", "network"],
+     "💡 Performance: Optimize network calls, implement connection pooling, review network infrastructure, and add latency monitoring."),
+    ("Capacity", ["queue", "limit", "approaching"],
+     "💡 Capacity: Monitor queue sizes, implement auto-scaling, optimize message processing, and add queue depth alerts."),
+    ("Capacity", ["rate limit", "requests"],
+     "💡 Capacity: Review rate limiting policies, implement request throttling, consider increasing limits, and add rate limiting alerts."),
+    ("Caching", ["cache", "hit ratio"],
+     "💡 Caching: Optimize cache configuration, review cache key strategies, implement cache warming, and monitor cache performance metrics."),
+    ("Scheduling", ["scheduled", "task", "delayed"],
+     "💡 Scheduling: Review task scheduling configuration, optimize task execution time, implement task monitoring, and add scheduling alerts."),
+    ("JVM", ["garbage collection", "gc"],
+     "💡 JVM: Tune garbage collection parameters, review heap configuration, implement GC monitoring, and optimize memory allocation patterns."),
+    ("Connection Management", ["connection pool", "connections available"],
+     "💡 Connection Management: Increase connection pool size, implement connection monitoring, optimize connection usage, and add pool health checks."),
+]
+
+WARNING_FALLBACK = ("Monitoring",
+                    "💡 Monitoring: Monitor {component} component closely, implement alerting for this warning type, and review system metrics regularly.")
+
+
+# Changes whenever the rule tables or the fingerprint patterns do, so cached results
+# of older rule sets (or groupings) are not reused.
+RULES_VERSION = hashlib.sha1(
+    json.dumps([ERROR_RULES, ERROR_FALLBACK, WARNING_RULES, WARNING_FALLBACK, _VARIABLE_PARTS.pattern]).encode("utf-8")
+).hexdigest()[:12]
+
+
+def _trie_pattern(words) -> str:
+    """
+    Build a regex matching the longest of ``words`` at a position.
+
+    Shared prefixes are factored out so a position that starts no keyword is
+    rejected after a single character comparison.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of a fixed vocabulary occurring in a text in one scan.
+
+    The keywords are compiled into a single trie-shaped regex that matches the
+    longest keyword starting at a position; the scan resumes one character after
+    each hit so overlapping keywords are not lost. Each keyword owns one bit, and
+    the mask of a hit also carries the bits of the shorter keywords that are its
+    prefixes, so OR-ing the masks of all hits gives exactly
+    ``{k for k in keywords if k in text}``.
+    """
+
+    def __init__(self, keywords):
+        vocab = sorted(set(keywords))
+        self.bits = {k: 1 << i for i, k in enumerate(vocab)}
+        self.pattern = re.compile(_trie_pattern(vocab))
+        self.masks = {
+            k: sum(self.bits[p] for p in vocab if k.startswith(p)) for k in vocab
+        }
+
+    def mask(self, keywords) -> int:
+        return sum(self.bits[k] for k in set(keywords))
+
+    def find(self, text: str) -> int:
+        found = 0
+        masks = self.masks
+        search = self.pattern.search
+        match = search(text)
+        while match:
+            found |= masks[match.group()]
+            match = search(text, match.start() + 1)
+        return found
+
+
+def _rule_keywords():
+    for _, gate, fixes in ERROR_RULES:
+        yield from gate
+        for condition, _ in fixes:
+            for group in condition:
+                yield from group
+    for _, gate, _ in WARNING_RULES:
+        yield from gate
+
+
+@lru_cache(maxsize=None)
+def compiled_rules() -> Tuple[KeywordMatcher, List, List]:
+    """
+    The keyword matcher and the error and warning rules with their keywords as matcher bit masks.
+
+    Compiled on the first rule match rather than at import, so the MCP server
+    starts answering sooner; warm_server.py compiles them before forking workers.
+    """
+    matcher = KeywordMatcher(_rule_keywords())
+    error_rules = [
+        (category, matcher.mask(gate),
+         [([matcher.mask(group) for group in condition], suggestion) for condition, suggestion in fixes])
+        for category, gate, fixes in ERROR_RULES
+    ]
+    warning_rules = [(category, matcher.mask(gate), suggestion) for category, gate, suggestion in WARNING_RULES]
+    return matcher, error_rules, warning_rules
+
+
+# Metric label of every rule branch, keyed by the suggestion it emits.
+_RULE_BRANCHES = {
+    **{("errors", suggestion): f"{category}#{i}"
+       for category, _, fixes in ERROR_RULES for i, (_, suggestion) in enumerate(fixes)},
+    **{("warnings", suggestion): f"{category}#{i}" for i, (category, _, suggestion) in enumerate(WARNING_RULES)},
+}
+
+
+@lru_cache(maxsize=4096)
+def match_error_rule(message: str, component: str) -> Tuple[str, Optional[str]]:
+    """
+    Resolve an error message to its rule category and suggestion.
+
+    The suggestion is None when a category matched but none of its fixes apply.
+    """
+    matcher, error_rules, _ = compiled_rules()
+    found = matcher.find(message.lower())
+    if found:
+        for category, gate, fixes in error_rules:
+            if found & gate:
+                for condition, suggestion in fixes:
+                    if all(found & group for group in condition):
+                        return category, suggestion
+                return category, None
+    category, suggestion = ERROR_FALLBACK
+    return category, suggestion.format(component=component.lower())
+
+
+@lru_cache(maxsize=4096)
+def match_warning_rule(message: str, component: str) -> Tuple[str, str]:
+    """
+    Resolve a warning message to its rule category and suggestion.
+    """
+    matcher, _, warning_rules = compiled_rules()
+    found = matcher.find(message.lower())
+    if found:
+        for category, gate, suggestion in warning_rules:
+            if found & gate:
+                return category, suggestion
+    category, suggestion = WARNING_FALLBACK
+    return category, suggestion.format(component=component.lower())
+
+
+def suggest_chunk(issues: List[Dict], kind: str) -> List[str]:
+    """
+    Match errors or warnings against the rules, in order, skipping errors whose
+    category has no applicable fix.
+    """
+    match_rule = match_error_rule if kind == "errors" else match_warning_rule
+    count_hits = METRICS.enabled
+    suggestions = []
+    for issue in issues:
+        category, suggestion = match_rule(safe_str(issue.get("message")), safe_str(issue.get("component")))
+        if count_hits:
+            METRICS.count("rule_hits", issue.get("count", 1), kind=kind,
+                          rule=_RULE_BRANCHES.get((kind, suggestion), f"{category}#none" if suggestion is None else category))
+        if suggestion is not None:
+            suggestions.append(suggestion)
+    return suggestions
+
+
+@mcp.tool()
+@instrumented
+def suggest_fix(errors_and_warnings: Dict, parallel: bool = False) -> List[str]:
+    """
+    Suggest potential fixes for each issue based on the log message content.
+
+    Args:
+        errors_and_warnings (Dict): Dictionary containing analyzed errors and warnings,
+            either grouped as returned by analyze_logs or as individual entries.
+        parallel (bool): Match large issue lists against the rules on all CPU cores.
+
+    Returns:
+        List of textual suges or actions to take for each issue.
+    """
+    suges = []
+    errors = errors_and_warnings.get("errors", [])
+    warnings = errors_and_warnings.get("warnings", [])
+
+    if parallel and use_parallel(len(errors) + len(warnings)):
+        for chunk in map_chunks(suggest_worker, errors, "errors") + map_chunks(suggest_worker, warnings, "warnings"):
+            suges.extend(chunk)
+    else:
+        suges.extend(suggest_chunk(errors, "errors"))
+        suges.extend(suggest_chunk(warnings, "warnings"))
 
     # Handle empty results
     if not suges:
@@ -257,8 +1033,8 @@ def suggest_fix(errors_and_warnings: Dict) -> List[str]:
                 "✅ No critical issues found. Continue monitoring system health and maintain current operational practices.")
 
     # Add general recommendations if there are multiple issues
-    error_count = len(errors_and_warnings.get("errors", []))
-    warning_count = len(errors_and_warnings.get("warnings", []))
+    error_count = sum(error.get("count", 1) for error in errors)
+    warning_count = sum(warning.get("count", 1) for warning in warnings)
 
     if error_count > 3:
         suges.append(
@@ -271,5 +1047,24 @@ def suggest_fix(errors_and_warnings: Dict) -> List[str]:
     return suges
 
 
+@mcp.tool()
+def get_metrics(format: str = "json", reset: bool = False) -> Any:
+    """
+    Report the server's instrumentation: per-tool call counts and timings, payload
+    sizes, analyzed entry counts and hits per suggest_fix rule branch.
+
+    Instrumentation is off unless the server runs with LOG_ANALYZER_METRICS=1.
+    Rule branch hits are collected on the serial suggest_fix path only.
+
+    Args:
+        format (str): "json" for a structured snapshot or "prometheus" for the text exposition format.
+        reset (bool): Clear all metrics after reading them.
+    """
+    result = METRICS.to_prometheus() if format.lower() == "prometheus" else METRICS.snapshot()
+    if reset:
+        METRICS.reset()
+    return result
+
+
 if __name__ == "__main__":
     mcp.run(transport='stdio')
@@ -0,0 +1,260 @@
+"""
+Analyze many log files at once, e.g. a directory of rotated logs from several services.
+
+Files are scheduled on a bounded pool of asyncio workers. Files are parsed in
+the shared process pool of log_parallel and the local rules run in worker
+threads; agent runs and escalations share the one MCP
+session of an MCPSessionPool and are limited to ``llm_concurrency`` at a time.
+Per-file results are yielded as soon as each file finishes and can be folded
+into a cross-file BatchSummary.
+
+    python batch_analysis.py "Test logs/*.json" /var/log/app --workers 8
+    python batch_analysis.py logs/ --mode agent --llm-concurrency 2 --output summary.json
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from log_parallel import MAX_WORKERS, file_batch_worker, get_pool
+from streamlit_client import MCPSessionPool, add_escalation, build_escalation_prompt, local_rules
+
+DEFAULT_WORKERS = int(os.getenv("LOG_ANALYZER_BATCH_WORKERS", "4"))
+LLM_CONCURRENCY = int(os.getenv("LOG_ANALYZER_LLM_CONCURRENCY", "2"))
+LOG_EXTENSIONS = (".json", ".ndjson", ".jsonl", ".gz", ".zst")
+# "rules": local rules only, no LLM; "local": rules, escalating unknown issues to the agent; "agent": full agent run
+MODES = ("rules", "local", "agent")
+
+_DONE = object()
+
+
+def expand_paths(inputs: Iterable[str]) -> List[str]:
+    """Files, directories (searched recursively for log files) and glob patterns, deduplicated and sorted."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files if name.lower().endswith(LOG_EXTENSIONS))
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            paths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+async def load_batch(path: str):
+    """Parse a file in the shared process pool, so parsing scales past the GIL with the worker count."""
+    if MAX_WORKERS > 1:
+        return await asyncio.get_running_loop().run_in_executor(get_pool(), file_batch_worker, path)
+    return await asyncio.to_thread(file_batch_worker, path)
+
+
+async def analyze_file(path: str, pool: Optional[MCPSessionPool], mode: str, llm: asyncio.Semaphore) -> Dict:
+    """Analyze one file; failures are reported in the result rather than raised."""
+    started = time.perf_counter()
+    try:
+        batch = await load_batch(path)
+        if mode == "agent":
+            async with llm:
+                result = await pool.run_agent(path=path, batch=batch)
+        else:
+            # Only the rules pass runs in a thread. The escalation is awaited here on the
+            # loop: a worker thread blocked on the loop it runs for could exhaust the
+            # default executor the agent itself needs.
+            result = await asyncio.to_thread(local_rules, batch=batch)
+            if mode == "local" and result["metrics"]["escalated_issues"]:
+                async with llm:
+                    llm_started = time.perf_counter()
+                    escalation = await pool.run_prompt(build_escalation_prompt(result["unresolved"]))
+                add_escalation(result, escalation, time.perf_counter() - llm_started)
+        error = result.get("error") if isinstance(result, dict) else None
+        return {
+            "path": path,
+            "status": "error" if error else "ok",
+            "error": error,
+            "seconds": time.perf_counter() - started,
+            "summary": batch.summary(),
+            "state": batch.state(),
+            "result": result
+        }
+    except Exception as e:
+        return {"path": path, "status": "error", "error": f"{type(e).__name__}: {e}",
+                "seconds": time.perf_counter() - started, "summary": None, "state": None, "result": None}
+
+
+async def analyze_files(paths: List[str], pool: Optional[MCPSessionPool] = None, mode: str = "local",
+                        workers: int = DEFAULT_WORKERS, llm_concurrency: int = LLM_CONCURRENCY) -> AsyncIterator[Dict]:
+    """
+    Yield a result per file, in completion order, from ``workers`` concurrent workers.
+
+    With a pool this must run on ``pool.loop``; modes other than "rules" need one.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unsupported mode: {mode}. Use one of {', '.join(MODES)}.")
+    if mode != "rules" and pool is None:
+        raise ValueError(f"Mode {mode} needs an MCPSessionPool")
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for path in paths:
+        pending.put_nowait(path)
+    finished: asyncio.Queue = asyncio.Queue()
+    llm = asyncio.Semaphore(max(1, llm_concurrency))
+
+    async def worker():
+        while not pending.empty():
+            path = pending.get_nowait()
+            await finished.put(await analyze_file(path, pool, mode, llm))
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(min(max(1, workers), len(paths)))]
+    try:
+        for _ in paths:
+            yield await finished.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def stream_files(paths: List[str], pool: Optional[MCPSessionPool] = None, mode: str = "local",
+                 workers: int = DEFAULT_WORKERS, llm_concurrency: int = LLM_CONCURRENCY) -> Iterator[Dict]:
+    """
+    Blocking iterator over analyze_files for synchronous callers such as Streamlit.
+
+    The workers run on the pool's event loop (or a private one for "rules" mode)
+    and results are handed over through a thread-safe queue as they finish.
+    """
+    results: queue.Queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for result in analyze_files(paths, pool, mode, workers, llm_concurrency):
+                results.put(result)
+        finally:
+            results.put(_DONE)
+
+    if pool is not None:
+        future = asyncio.run_coroutine_threadsafe(pump(), pool.loop)
+    else:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-analysis")
+        future = executor.submit(asyncio.run, pump())
+        executor.shutdown(wait=False)
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            yield item
+        future.result()
+    finally:
+        future.cancel()
+
+
+class BatchSummary:
+    """
+    Cross-file summary: totals, failures and issue groups merged over every file.
+
+    Groups with the same fingerprint and component in different files are merged
+    and list the files they occur in; ``result`` ranks them by total count.
+    """
+
+    def __init__(self):
+        from analyzer import IssueAggregator
+
+        self.aggregator = IssueAggregator()
+        self.files: Dict[str, Dict] = {"errors": {}, "warnings": {}}
+        self.analyzed: List[str] = []
+        self.failed: List[Dict] = []
+        self.total_files = 0
+        self.seconds = 0.0
+
+    def add(self, file_result: Dict) -> None:
+        self.total_files += 1
+        self.seconds += file_result["seconds"]
+        if file_result["status"] != "ok":
+            self.failed.append({"path": file_result["path"], "error": file_result["error"]})
+        if file_result["state"] is None:
+            return
+        self.analyzed.append(file_result["path"])
+        self.aggregator.merge(file_result["state"])
+        for kind in ("errors", "warnings"):
+            for key in file_result["state"][2][kind]:
+                self.files[kind].setdefault(key, []).append(file_result["path"])
+
+    def result(self, top_n: Optional[int] = None) -> Dict:
+        groups = {}
+        for kind in ("errors", "warnings"):
+            ranked = sorted(self.aggregator.groups[kind].items(), key=lambda item: -item[1]["count"])
+            groups[kind] = [dict(group, files=sorted(self.files[kind][key])) for key, group in ranked[:top_n]]
+        return {
+            "files": self.total_files,
+            "analyzed": len(self.analyzed),
+            "failed": self.failed,
+            "file_seconds": self.seconds,
+            "summary": self.aggregator.summary(),
+            **groups,
+            "stack_traces": self.aggregator.traces.result()[:top_n]
+        }
+
+
+def _file_line(result: Dict) -> str:
+    if result["summary"] is None:
+        return f"❌ {result['path']}: {result['error']}"
+    summary = result["summary"]
+    status = "✅" if result["status"] == "ok" else "⚠️"
+    line = (f"{status} {result['path']}: {summary['total_logs']} entries, {summary['error_count']} errors, "
+            f"{summary['warning_count']} warnings ({result['seconds']:.2f}s)")
+    return line if result["status"] == "ok" else f"{line}: {result['error']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze many log files concurrently and merge the results.")
+    parser.add_argument("inputs", nargs="+", help="Log files, directories or glob patterns (quote globs)")
+    parser.add_argument("--mode", choices=MODES, default="rules",
+                        help="rules: local rules only; local: escalate unknown issues to the agent; agent: full agent run")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY, help="Agent runs in flight at once")
+    parser.add_argument("--top", type=int, default=20, help="Issue groups per level in the printed summary")
+    parser.add_argument("--output", help="Write per-file results and the merged summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.inputs)
+    if not paths:
+        print("No log files found.", file=sys.stderr)
+        return 1
+
+    pool = MCPSessionPool() if args.mode != "rules" else None
+    started = time.perf_counter()
+    summary = BatchSummary()
+    results = []
+    try:
+        for result in stream_files(paths, pool, args.mode, args.workers, args.llm_concurrency):
+            summary.add(result)
+            results.append({key: value for key, value in result.items() if key != "state"})
+            print(_file_line(result), flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+
+    merged = summary.result()
+    totals = merged["summary"]
+    print(f"\n{len(paths)} files in {time.perf_counter() - started:.2f}s: {totals['total_logs']} entries, "
+          f"{totals['error_count']} errors ({totals['distinct_errors']} distinct), "
+          f"{totals['warning_count']} warnings ({totals['distinct_warnings']} distinct), {len(merged['failed'])} failed")
+    for kind in ("errors", "warnings"):
+        for group in merged[kind][:args.top]:
+            print(f"  {kind[:-1]:<7} {group['count']:>8}x {group['component']}: {group['fingerprint']} "
+                  f"[{len(group['files'])} file(s)]")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"files": results, "summary": merged}, f, indent=2, default=str)
+    return 1 if merged["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
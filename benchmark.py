@@ -0,0 +1,333 @@
+"""
+Offline benchmark for the analyzer tools.
+
+Measures throughput, per-entry latency percentiles and peak RSS of analyze_logs,
+suggest_fix and the columnar LogBatch on synthetic logs, optionally the end-to-end MCP stdio round trip
+and the server's time to first tool result, and compares the results with a stored baseline.
+No API key or network access is needed.
+
+    python benchmark.py --sizes 1000,100000 --duplication 0.9
+    python benchmark.py --save-baseline
+    python benchmark.py --mcp
+    python benchmark.py --startup --sizes ""
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from log_generator import generate_logs, write_logs
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+LATENCY_SAMPLE = 20000
+TOOLS = ("analyze_logs", "suggest_fix", "log_batch")
+# Slowdowns smaller than this are timer noise, whatever their percentage.
+MIN_REGRESSION_SECONDS = 0.005
+# How the MCP client reaches the server: "mcp_cli" spawns ``mcp run analyzer.py`` (mcp_config_2.json),
+# "stdio" spawns ``python analyzer.py``, "bridge" spawns the stdio relay to a warm server and
+# "socket" connects to the warm server directly.
+STARTUP_VARIANTS = ("mcp_cli", "stdio", "bridge", "socket")
+STARTUP_ISSUES = {"errors": [{"message": "Database connection timeout", "component": "DatabaseService"}],
+                  "warnings": [{"message": "Memory usage reached 91%", "component": "SystemMonitor"}]}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _clear_caches():
+    import analyzer
+
+    analyzer.fingerprint.cache_clear()
+    analyzer.match_error_rule.cache_clear()
+    analyzer.match_warning_rule.cache_clear()
+
+
+def _measure(tool: str, size: int, duplication: float, seed: int) -> Dict:
+    """Run one tool on one generated dataset; meant to run in a fresh process."""
+    import analyzer
+
+    if tool == "log_batch":
+        # Parsed from NDJSON straight into the columns, the entry dicts are never held
+        # together. Unlike analyze_logs the timing includes JSON parsing.
+        from log_stream import iter_log_file
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs.ndjson")
+            write_logs(path, size, duplication, seed)
+            _clear_caches()
+            started = time.perf_counter()
+            batch = analyzer.LogBatch(iter_log_file(path))
+            batch.result()
+            elapsed = time.perf_counter() - started
+        items = [json.dumps(log) for log in generate_logs(min(size, LATENCY_SAMPLE), duplication, seed)]
+
+        # One NDJSON line through the same path: parse, columns, then grouping in result()
+        def one(line):
+            analyzer.LogBatch((json.loads(line),)).result()
+    else:
+        logs = list(generate_logs(size, duplication, seed))
+        _clear_caches()
+
+    if tool == "analyze_logs":
+        items = logs
+        started = time.perf_counter()
+        analyzer.analyze_logs(logs)
+        elapsed = time.perf_counter() - started
+        # Per-entry cost of the path timed above (serial analyze_logs on a LogBatch),
+        # including the fingerprinting and grouping that result() runs lazily
+        def one(log):
+            analyzer.LogBatch((log,)).result()
+    elif tool == "suggest_fix":
+        # Raw, ungrouped issues: the worst case for the rule matcher
+        issues = {"errors": [], "warnings": []}
+        for log in logs:
+            issue = analyzer.extract_issue(log)
+            if issue is not None:
+                issues[issue[0]].append(issue[1])
+        items = [("errors", issue) for issue in issues["errors"]] + [("warnings", issue) for issue in issues["warnings"]]
+        started = time.perf_counter()
+        analyzer.suggest_fix(issues)
+        elapsed = time.perf_counter() - started
+
+        def one(item):
+            analyzer.suggest_chunk([item[1]], item[0])
+
+    _clear_caches()
+    latencies = []
+    for item in items[:LATENCY_SAMPLE]:
+        started_ns = time.perf_counter_ns()
+        one(item)
+        latencies.append((time.perf_counter_ns() - started_ns) / 1000)
+    latencies.sort()
+
+    count = size if tool == "log_batch" else len(items)
+    return {
+        "tool": tool,
+        "size": size,
+        "items": count,
+        "seconds": round(elapsed, 4),
+        "throughput_per_s": round(count / elapsed, 1) if elapsed else None,
+        "p50_us": round(percentile(latencies, 0.50), 2),
+        "p99_us": round(percentile(latencies, 0.99), 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _measure_in_child(queue, *args):
+    queue.put(_measure(*args))
+
+
+def measure(tool: str, size: int, duplication: float, seed: int) -> Dict:
+    """Run ``_measure`` in a spawned process so peak RSS covers only this case."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure_in_child, args=(queue, tool, size, duplication, seed))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+async def _mcp_round_trip(size: int, duplication: float, seed: int, repeat: int) -> Dict:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyzer.py")
+    logs = list(generate_logs(size, duplication, seed))
+    payload_bytes = len(json.dumps({"logs": logs}).encode("utf-8"))
+
+    started = time.perf_counter()
+    async with stdio_client(StdioServerParameters(command=sys.executable, args=[server])) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            startup = time.perf_counter() - started
+            timings = []
+            for _ in range(repeat):
+                call_started = time.perf_counter()
+                await session.call_tool("analyze_logs", {"logs": logs})
+                timings.append(time.perf_counter() - call_started)
+    timings.sort()
+
+    return {
+        "tool": "mcp_stdio_round_trip",
+        "size": size,
+        "payload_bytes": payload_bytes,
+        "startup_seconds": round(startup, 4),
+        "seconds": round(percentile(timings, 0.5), 4),
+        "p99_seconds": round(percentile(timings, 0.99), 4),
+    }
+
+
+def _startup_transport(variant: str, address: str):
+    from mcp import StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from warm_server import socket_client
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    if variant == "socket":
+        return socket_client(address)
+    if variant == "mcp_cli":
+        command, args = shutil.which("mcp"), ["run", os.path.join(here, "analyzer.py")]
+    elif variant == "stdio":
+        command, args = sys.executable, [os.path.join(here, "analyzer.py")]
+    else:
+        command, args = sys.executable, [os.path.join(here, "warm_server.py"), "--bridge", "--address", address]
+    return stdio_client(StdioServerParameters(command=command, args=args))
+
+
+async def _first_tool_result(variant: str, address: str) -> float:
+    """Seconds from launching (or connecting to) the server until a suggest_fix result arrives."""
+    from mcp import ClientSession
+
+    started = time.perf_counter()
+    async with _startup_transport(variant, address) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool("suggest_fix", {"errors_and_warnings": STARTUP_ISSUES})
+            return time.perf_counter() - started
+
+
+def startup(variants: List[str], repeat: int, address: str) -> List[Dict]:
+    """
+    Time to first tool result per variant, over ``repeat`` fresh sessions each.
+
+    A warm server is started on ``address`` for the bridge and socket variants.
+    Each variant gets one untimed run first, so the client's own first-use costs
+    and a cold disk cache don't count against whichever variant runs first.
+    """
+    from warm_server import connect
+
+    if "mcp_cli" in variants and shutil.which("mcp") is None:
+        print("mcp CLI not found, skipping the mcp_cli variant")
+        variants = [variant for variant in variants if variant != "mcp_cli"]
+    server = None
+    if {"bridge", "socket"} & set(variants):
+        here = os.path.dirname(os.path.abspath(__file__))
+        server = subprocess.Popen([sys.executable, os.path.join(here, "warm_server.py"), "--address", address])
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                connect(address).close()
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"Warm server on {address} did not start")
+                time.sleep(0.05)
+
+    results = []
+    try:
+        for variant in variants:
+            asyncio.run(_first_tool_result(variant, address))
+            timings = sorted(asyncio.run(_first_tool_result(variant, address)) for _ in range(repeat))
+            results.append({
+                "tool": f"startup_{variant}",
+                "size": 0,
+                "seconds": round(percentile(timings, 0.5), 4),
+                "p99_seconds": round(timings[-1], 4),
+            })
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Cases whose time grew by more than ``tolerance`` (a fraction) versus the baseline."""
+    previous = {(item["tool"], item["size"]): item for item in baseline}
+    regressions = []
+    for item in results:
+        before = previous.get((item["tool"], item["size"]))
+        if (before and before["seconds"] and item["seconds"] > before["seconds"] * (1 + tolerance)
+                and item["seconds"] - before["seconds"] > MIN_REGRESSION_SECONDS):
+            regressions.append(
+                f"{item['tool']} size={item['size']}: {before['seconds']}s -> {item['seconds']}s "
+                f"(+{(item['seconds'] / before['seconds'] - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the log analyzer tools offline.")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated entry counts, e.g. 1000,100000,10000000")
+    parser.add_argument("--duplication", type=float, default=0.5, help="Share of repeated messages (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tools", default=",".join(TOOLS))
+    parser.add_argument("--mcp", action="store_true", help="Also time analyze_logs over a real MCP stdio session")
+    parser.add_argument("--mcp-size", type=int, default=1000)
+    parser.add_argument("--mcp-repeat", type=int, default=5)
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time the MCP server's first tool result, cold and through a warm server")
+    parser.add_argument("--startup-variants", default=",".join(STARTUP_VARIANTS))
+    parser.add_argument("--startup-repeat", type=int, default=5)
+    parser.add_argument("--warm-address", default="127.0.0.1:8766", help="Address of the warm server started for --startup")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before flagging a regression")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",") if size):
+        for tool in args.tools.split(","):
+            result = measure(tool, size, args.duplication, args.seed)
+            results.append(result)
+            print(f"{tool:<14} n={size:<9} {result['seconds']:>9.4f}s  {result['throughput_per_s']:>12}/s  "
+                  f"p50={result['p50_us']}us  p99={result['p99_us']}us  rss={result['peak_rss_mb']}MB")
+
+    if args.mcp:
+        result = asyncio.run(_mcp_round_trip(args.mcp_size, args.duplication, args.seed, args.mcp_repeat))
+        results.append(result)
+        print(f"mcp stdio      n={args.mcp_size:<9} startup={result['startup_seconds']}s  "
+              f"call p50={result['seconds']}s p99={result['p99_seconds']}s  payload={result['payload_bytes']}B")
+
+    if args.startup:
+        for result in startup(args.startup_variants.split(","), args.startup_repeat, args.warm_address):
+            results.append(result)
+            print(f"{result['tool']:<16} first tool result p50={result['seconds']}s max={result['p99_seconds']}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
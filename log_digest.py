@@ -0,0 +1,131 @@
+import os
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from log_index import MISSING_TIME, format_timestamp
+from stack_traces import SIGNATURE_FRAMES
+
+# Rough size of a token for English text and JSON-ish log lines; good enough to
+# keep a prompt under budget without shipping a tokenizer.
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LOG_ANALYZER_PROMPT_TOKENS", "4000"))
+MAX_LINE_CHARS = 300
+# Signatures, components and traces of the largest groups are offered before the rest.
+TOP_ITEMS = 10
+TOP_TRACES = 3
+# Kept free for section headings and the note about omitted items.
+RESERVED_TOKENS = 80
+
+# Digest sections in output order, with their headings
+SECTIONS = {
+    "components": "Components (errors/warnings/total)",
+    "errors": "Error signatures (count x component: signature [first .. last seen])",
+    "warnings": "Warning signatures (count x component: signature [first .. last seen])",
+    "traces": "Stack trace groups (count x exception [components], root cause, top frames)",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _clip(text: str, limit: int = MAX_LINE_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _signature_line(group: Dict) -> str:
+    return (f"- {group['count']}x {group['component'] or '?'}: {_clip(group['fingerprint'])} "
+            f"[{group['first_seen'] or '?'} .. {group['last_seen'] or '?'}]")
+
+
+def _trace_line(group: Dict) -> str:
+    exception = f"{group['exception_type']}: {group['message']}" if group["message"] else group["exception_type"]
+    lines = [f"- {group['count']}x {_clip(exception, 160)} [{', '.join(group['components']) or '?'}]"]
+    if group["root_cause"]:
+        lines.append(f"    root cause: {_clip(group['root_cause'], 160)}")
+    lines.extend(f"    at {_clip(frame, 160)}" for frame in group["top_frames"][:SIGNATURE_FRAMES])
+    return "\n".join(lines)
+
+
+def _header(batch) -> List[str]:
+    times = [seconds for seconds in batch.epochs() if seconds != MISSING_TIME]
+    levels = Counter(batch.columns["level"])
+    lines = [f"Entries: {len(batch)}"]
+    if times:
+        lines.append(f"Time range: {format_timestamp(min(times))} .. {format_timestamp(max(times))}")
+    if levels:
+        lines.append("Levels: " + ", ".join(f"{batch.tables['level'][code] or '?'}={count}"
+                                           for code, count in levels.most_common()))
+    return lines
+
+
+def _component_lines(batch) -> List[str]:
+    tables = batch.tables
+    level_codes = {level: tables["level"].index(level) if level in tables["level"] else None
+                   for level in ("ERROR", "WARNING")}
+    counts = Counter(zip(batch.columns["component"], batch.columns["level"]))
+    rows = {}
+    for (component, level), count in counts.items():
+        row = rows.setdefault(component, [0, 0, 0])
+        row[2] += count
+        if level == level_codes["ERROR"]:
+            row[0] += count
+        elif level == level_codes["WARNING"]:
+            row[1] += count
+    ranked = sorted(rows.items(), key=lambda item: (-item[1][0], -item[1][1], -item[1][2]))
+    return [f"- {tables['component'][component] or '?'}: {errors}/{warnings}/{total}"
+            for component, (errors, warnings, total) in ranked]
+
+
+def build_digest(batch, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Tuple[str, Dict]:
+    """
+    Compact text digest of an analyzer LogBatch that fits roughly ``token_budget`` tokens.
+
+    The summary (entry count, time range, counts per level) is always included.
+    The remaining budget is filled in priority order: the largest error signatures,
+    the largest stack trace groups with their root cause and top frames, the
+    largest warning signatures and the busiest components, then everything else.
+    Items that don't fit are skipped and counted in the returned stats.
+    """
+    errors = sorted(batch.groups("errors"), key=lambda group: -group["count"])
+    warnings = sorted(batch.groups("warnings"), key=lambda group: -group["count"])
+    components = _component_lines(batch)
+    traces = [_trace_line(group) for group in batch.trace_groups().result()]
+
+    # (beyond the top items, section rank, section, position within the section, text)
+    candidates = []
+    for rank, (section, lines, top) in enumerate((("errors", [_signature_line(group) for group in errors], TOP_ITEMS),
+                                                  ("traces", traces, TOP_TRACES),
+                                                  ("warnings", [_signature_line(group) for group in warnings], TOP_ITEMS),
+                                                  ("components", components, TOP_ITEMS))):
+        for position, text in enumerate(lines):
+            candidates.append((position >= top, rank, section, position, text))
+    candidates.sort(key=lambda candidate: candidate[:2])
+
+    header = "\n".join(_header(batch))
+    remaining = token_budget - estimate_tokens(header) - RESERVED_TOKENS
+    included: Dict[str, List[Tuple[int, str]]] = {section: [] for section in SECTIONS}
+    omitted: Dict[str, int] = {}
+    for _, _, section, position, text in candidates:
+        cost = estimate_tokens(text) + 1
+        if cost <= remaining:
+            remaining -= cost
+            included[section].append((position, text))
+        else:
+            omitted[section] = omitted.get(section, 0) + 1
+
+    parts = [header]
+    for section, heading in SECTIONS.items():
+        if included[section]:
+            parts.append(f"## {heading}\n" + "\n".join(text for _, text in sorted(included[section])))
+    if omitted:
+        parts.append("Omitted to fit the budget: " + ", ".join(f"{count} {section}" for section, count in omitted.items()))
+    digest = "\n".join(parts)
+
+    return digest, {
+        "token_budget": token_budget,
+        "estimated_tokens": estimate_tokens(digest),
+        "included": sum(len(lines) for lines in included.values()),
+        "omitted": omitted
+    }
@@ -0,0 +1,150 @@
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+# (level, component, message template, stack trace template) per message family.
+# Templates are filled with random values, so each family yields many distinct
+# raw messages that share one fingerprint.
+FAMILIES: Dict[str, List[Tuple[str, str, str, str]]] = {
+    "database": [
+        ("ERROR", "OrderService", "Database connection timeout after {n} seconds",
+         "java.sql.SQLTimeoutException: timeout after {n}s at OrderRepository.java:{line}"),
+        ("ERROR", "PaymentService", "Deadlock detected in transaction {id}",
+         "org.postgresql.util.PSQLException: deadlock detected at PaymentDao.java:{line}"),
+        ("WARNING", "OrderService", "Connection pool running low: {n}/50 connections available", ""),
+    ],
+    "memory": [
+        ("ERROR", "ImageProcessor", "OutOfMemoryError: Java heap space while processing batch {id}",
+         "java.lang.OutOfMemoryError: Java heap space at ImageProcessor.java:{line}"),
+        ("WARNING", "SystemMonitor", "Memory usage reached {pct}%", ""),
+        ("WARNING", "JvmMonitor", "JVM garbage collection taking longer than usual: {n}s", ""),
+    ],
+    "auth": [
+        ("ERROR", "AuthService", "NullPointerException in module AuthService for user {id}",
+         "java.lang.NullPointerException at AuthService.java:{line}"),
+        ("ERROR", "AuthService", "OAuth token expired for client {id}",
+         "com.auth.TokenExpiredException: token expired at TokenValidator.java:{line}"),
+        ("ERROR", "DirectoryService", "LDAP bind failed for host {ip}", ""),
+    ],
+    "network": [
+        ("ERROR", "PaymentService", "Timeout while connecting to PaymentGateway after {n}ms",
+         "TimeoutError: Connection to PaymentGateway timed out after {n}ms"),
+        ("ERROR", "ApiGateway", "SSL handshake failed with {ip}", ""),
+        ("WARNING", "ApiGateway", "High network latency detected: {n}ms", ""),
+    ],
+    "kafka": [
+        ("ERROR", "EventPublisher", "Kafka broker {ip} not available, retrying",
+         "org.apache.kafka.common.errors.TimeoutException at KafkaProducer.java:{line}"),
+        ("WARNING", "EventConsumer", "Message queue depth approaching limit: {n} messages", ""),
+    ],
+    "redis": [
+        ("ERROR", "SessionCache", "Redis connection pool exhausted after {n} attempts",
+         "redis.clients.jedis.exceptions.JedisExhaustedPoolException at SessionCache.java:{line}"),
+        ("WARNING", "SessionCache", "Cache hit ratio dropped to {pct}%", ""),
+    ],
+    "system": [
+        ("WARNING", "StorageMonitor", "Disk usage exceeded {pct}%", ""),
+        ("WARNING", "SystemMonitor", "High CPU usage detected: {pct}%", ""),
+        ("ERROR", "ReportService", "Batch job failed: daily_report_{id}", ""),
+    ],
+    "unknown": [
+        ("ERROR", "UserService", "Failed to load user preferences for {id}",
+         "SQLException: Table 'user_preferences' doesn't exist at UserService.java:{line}"),
+        ("WARNING", "SecurityService", "Certificate for {ip} expires in {n} days", ""),
+    ],
+    "info": [
+        ("INFO", "AuthService", "User login successful for {id}", ""),
+        ("INFO", "OrderService", "Order {id} created", ""),
+        ("DEBUG", "Scheduler", "Processing batch job: {id}", ""),
+    ],
+}
+
+# Share of generated entries per family; the rest of the mix follows real logs,
+# where INFO/DEBUG lines dominate.
+DEFAULT_WEIGHTS = {
+    "database": 8, "memory": 5, "auth": 6, "network": 8, "kafka": 4,
+    "redis": 4, "system": 6, "unknown": 3, "info": 56,
+}
+
+START_TIME = datetime(2025, 7, 26, 12, 0, tzinfo=timezone.utc)
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        n=rng.randint(1, 5000),
+        pct=rng.randint(50, 99),
+        line=rng.randint(10, 900),
+        id=f"{rng.getrandbits(40):010x}",
+        ip=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+    )
+
+
+def generate_logs(count: int, duplication: float = 0.5, seed: int = 0,
+                  weights: Dict[str, int] = None, entries_per_second: float = 20.0) -> Iterator[Dict]:
+    """
+    Yield ``count`` synthetic log entries in timestamp order.
+
+    With probability ``duplication`` an entry repeats the message of an earlier entry
+    of the same template verbatim; otherwise its variable parts (numbers, IDs, IPs)
+    are drawn fresh. Entries are generated lazily so large sizes can be streamed.
+    """
+    rng = random.Random(seed)
+    weights = weights or DEFAULT_WEIGHTS
+    templates = [template for family in weights for template in FAMILIES[family]]
+    cum_weights = list(accumulate(weights[family] / len(FAMILIES[family]) for family in weights for _ in FAMILIES[family]))
+    indices = range(len(templates))
+    last_filled: Dict[int, Tuple[str, str]] = {}
+
+    for i in range(count):
+        choice = rng.choices(indices, cum_weights=cum_weights)[0]
+        level, component, message, stack_trace = templates[choice]
+        if choice in last_filled and rng.random() < duplication:
+            text, trace = last_filled[choice]
+        else:
+            text, trace = _fill(message, rng), _fill(stack_trace, rng)
+            last_filled[choice] = (text, trace)
+
+        entry = {
+            "timestamp": (START_TIME + timedelta(seconds=i / entries_per_second)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "level": level,
+            "component": component,
+            "message": text,
+        }
+        if level == "ERROR":
+            entry["stack_trace"] = trace
+        yield entry
+
+
+def write_logs(path: str, count: int, duplication: float = 0.5, seed: int = 0, ndjson: bool = True) -> None:
+    """Write synthetic logs to ``path`` as NDJSON (default) or a JSON array, one entry at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        if not ndjson:
+            f.write("[\n")
+        for i, entry in enumerate(generate_logs(count, duplication, seed)):
+            if ndjson:
+                f.write(json.dumps(entry) + "\n")
+            else:
+                f.write((",\n" if i else "") + json.dumps(entry))
+        if not ndjson:
+            f.write("\n]\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic logs for the analyzer tools.")
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--duplication", type=float, default=0.5, help="Share of entries repeating an earlier message (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-array", action="store_true", help="Write a JSON array instead of NDJSON")
+    args = parser.parse_args(argv)
+
+    write_logs(args.path, args.count, args.duplication, args.seed, ndjson=not args.json_array)
+    print(f"Wrote {args.count} entries to {args.path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
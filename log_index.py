@@ -0,0 +1,194 @@
+import re
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ALL_LEVELS = "ALL"
+
+# Placeholder in int64 timestamp columns for entries without a parseable timestamp.
+MISSING_TIME = -(1 << 63)
+
+# fromisoformat before 3.11 only takes a fraction of 3 or 6 digits after ".", and a
+# UTC offset with a colon; these rewrite other fractions and offsets to that form.
+_FRACTION = re.compile(r"(?<=:\d\d)[.,](\d+)")
+_COMPACT_OFFSET = re.compile(r"(?<=\d)([+-]\d\d)(\d\d)$")
+_OFFSET = re.compile(r"[+-]\d\d:?\d\d")
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str) -> Optional[int]:
+    """
+    Parse an ISO 8601 timestamp into epoch seconds, or None if it isn't one.
+
+    Naive timestamps are taken as UTC. Results are memoized since log timestamps
+    repeat within the same second.
+    """
+    if not value:
+        return None
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        normalized = _FRACTION.sub(lambda match: "." + match[1][:6].ljust(6, "0"), text)
+        normalized = _COMPACT_OFFSET.sub(r"\1:\2", normalized)
+        try:
+            parsed = datetime.fromisoformat(normalized)
+        except ValueError:
+            # Unknown trailing text: the date and time alone, unless that would drop an offset
+            if _OFFSET.search(text, 19):
+                return None
+            try:
+                parsed = datetime.fromisoformat(text[:19])
+            except ValueError:
+                return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def format_timestamp(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _count(times: array, start: int, end: int) -> int:
+    return bisect_left(times, end) - bisect_left(times, start)
+
+
+class LogIndex:
+    """
+    Time index over a log dataset, built in one pass and queried without rescanning.
+
+    Timestamps are parsed once into epoch seconds and kept as sorted int64 arrays
+    per level and per (component, level), so the number of entries in any time
+    window is two binary searches. The sorted list of non-empty minutes drives the
+    per-minute histograms, so a window query costs O(log n + k) for k buckets.
+    """
+
+    def __init__(self, logs: Iterable[Dict[str, Any]]):
+        self._build(
+            (parse_timestamp(str(log.get("timestamp") or "")), str(log.get("level") or "").upper(),
+             str(log.get("component") or ""))
+            for log in logs
+        )
+
+    @classmethod
+    def from_batch(cls, batch) -> "LogIndex":
+        """
+        Build the index from an analyzer LogBatch: its int64 timestamp column and
+        interned level and component codes, without materializing entry dicts.
+        """
+        levels, components = batch.tables["level"], batch.tables["component"]
+        index = cls.__new__(cls)
+        index._build(zip(
+            (None if timestamp == MISSING_TIME else timestamp for timestamp in batch.epochs()),
+            map(levels.__getitem__, batch.columns["level"]),
+            map(components.__getitem__, batch.columns["component"])
+        ))
+        return index
+
+    def _build(self, rows: Iterable[Tuple[Optional[int], str, str]]) -> None:
+        """Index (epoch seconds or None, upper case level, component) rows."""
+        times: Dict[str, List[int]] = {}
+        component_times: Dict[Tuple[str, str], List[int]] = {}
+        minutes = set()
+        self.total_logs = 0
+        self.untimed = 0
+
+        for timestamp, level, component in rows:
+            self.total_logs += 1
+            if timestamp is None:
+                self.untimed += 1
+                continue
+            for key in (ALL_LEVELS, level):
+                times.setdefault(key, []).append(timestamp)
+                component_times.setdefault((component, key), []).append(timestamp)
+            minutes.add(timestamp - timestamp % 60)
+
+        self.times = {key: array("q", sorted(values)) for key, values in times.items()}
+        self.component_times = {key: array("q", sorted(values)) for key, values in component_times.items()}
+        self.components = sorted({component for component, _ in self.component_times})
+        self.minutes = array("q", sorted(minutes))
+
+    @property
+    def start(self) -> Optional[int]:
+        all_times = self.times.get(ALL_LEVELS)
+        return all_times[0] if all_times else None
+
+    @property
+    def end(self) -> Optional[int]:
+        all_times = self.times.get(ALL_LEVELS)
+        return all_times[-1] + 1 if all_times else None
+
+    def _times(self, level: str = ALL_LEVELS, component: Optional[str] = None) -> array:
+        level = level.upper()
+        if component is None:
+            return self.times.get(level, array("q"))
+        return self.component_times.get((component, level), array("q"))
+
+    def count(self, start: int, end: int, level: str = ALL_LEVELS, component: Optional[str] = None) -> int:
+        """Entries with start <= timestamp < end."""
+        return _count(self._times(level, component), start, end)
+
+    def counts(self, start: int, end: int, component: Optional[str] = None) -> Dict[str, int]:
+        return {
+            "total": self.count(start, end, ALL_LEVELS, component),
+            "errors": self.count(start, end, "ERROR", component),
+            "warnings": self.count(start, end, "WARNING", component)
+        }
+
+    def top_components(self, start: int, end: int, level: str = "ERROR", n: int = 5) -> List[Dict]:
+        counts = [(self.count(start, end, level, component), component) for component in self.components]
+        counts.sort(key=lambda item: (-item[0], item[1]))
+        return [{"component": component, "count": count} for count, component in counts[:n] if count]
+
+    def histogram(self, start: int, end: int, bucket_minutes: int = 1, component: Optional[str] = None) -> List[Dict]:
+        """Per-bucket counts for the non-empty buckets of the window."""
+        width = 60 * max(1, bucket_minutes)
+        buckets = []
+        first = bisect_left(self.minutes, start - start % 60)
+        last = bisect_left(self.minutes, end)
+        previous = None
+        for minute in self.minutes[first:last]:
+            bucket = minute - minute % width
+            if bucket == previous:
+                continue
+            previous = bucket
+            counts = self.counts(max(bucket, start), min(bucket + width, end), component)
+            if counts["total"]:
+                buckets.append({"start": format_timestamp(bucket), **counts})
+        return buckets
+
+    def query(self, start: Optional[int] = None, end: Optional[int] = None, component: Optional[str] = None,
+              level: str = "ERROR", top_n: int = 5, bucket_minutes: int = 1) -> Dict:
+        """
+        Counts, top components, histogram and change versus the preceding window of equal length.
+        """
+        if self.start is None:
+            return {"total_logs": self.total_logs, "untimed": self.untimed, "counts": None}
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+        if end <= start:
+            raise ValueError(f"Invalid window: end {format_timestamp(end)} is not after start {format_timestamp(start)}.")
+        length = end - start
+
+        current = self.counts(start, end, component)
+        previous = self.counts(start - length, start, component)
+        change = {}
+        for key, value in current.items():
+            change[key] = value - previous[key]
+            change[f"{key}_per_minute"] = round(value * 60 / length, 3)
+            change[f"{key}_ratio"] = round(value / previous[key], 3) if previous[key] else None
+
+        return {
+            "window": {"start": format_timestamp(start), "end": format_timestamp(end)},
+            "component": component,
+            "counts": current,
+            "previous_window": previous,
+            "change": change,
+            "top_components": self.top_components(start, end, level, top_n) if component is None else [],
+            "histogram": self.histogram(start, end, bucket_minutes, component)
+        }
@@ -0,0 +1,83 @@
+import math
+import os
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# Inputs smaller than this are analyzed serially even when parallel mode is
+# requested, so small requests don't pay for process startup and pickling.
+PARALLEL_THRESHOLD = int(os.getenv("LOG_ANALYZER_PARALLEL_THRESHOLD", "50000"))
+MAX_WORKERS = int(os.getenv("LOG_ANALYZER_WORKERS", "0")) or os.cpu_count() or 1
+# Chunks per worker; a few per worker keeps the pool busy when chunks run unevenly.
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_SIZE = 1000
+
+_pool: Optional["ProcessPoolExecutor"] = None
+
+
+def use_parallel(size: int) -> bool:
+    return MAX_WORKERS > 1 and size >= PARALLEL_THRESHOLD
+
+
+def get_pool() -> "ProcessPoolExecutor":
+    """
+    Return the process pool shared by all tool calls, starting it on first use.
+
+    multiprocessing is only imported then, keeping it out of server startup.
+    """
+    global _pool
+    if _pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _pool
+
+
+def chunk(items: List[Any]) -> List[List[Any]]:
+    size = max(MIN_CHUNK_SIZE, math.ceil(len(items) / (MAX_WORKERS * CHUNKS_PER_WORKER)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def map_chunks(worker: Callable, items: List[Any], *args: Any) -> List[Any]:
+    """
+    Run ``worker(chunk, *args)`` for consecutive chunks of ``items`` in the pool.
+
+    Results are returned in chunk order, so merging them in sequence reproduces
+    the serial result.
+    """
+    chunks = chunk(items)
+    if not chunks:
+        return []
+    return list(get_pool().map(worker, chunks, *([arg] * len(chunks) for arg in args)))
+
+
+# Pool workers. They import the analyzer by module name, which works whether the
+# server was started as a script, through ``mcp run`` or imported by the client,
+# and they return plain data so nothing depends on how the parent loaded it.
+
+def aggregate_worker(logs: List[dict]):
+    from analyzer import LogBatch
+
+    return LogBatch(logs).state()
+
+
+def suggest_worker(issues: List[dict], kind: str) -> List[str]:
+    from analyzer import suggest_chunk
+
+    return suggest_chunk(issues, kind)
+
+
+def file_batch_worker(path: str):
+    """
+    Parse a whole log file into a LogBatch, with its issue groups already computed.
+
+    The batch is only arrays, lists and dicts, so it pickles compactly; the parent
+    unpickles it as analyzer.LogBatch, imported by name like here.
+    """
+    from analyzer import LogBatch
+    from log_stream import iter_log_file
+
+    batch = LogBatch(iter_log_file(path))
+    batch.summary()
+    return batch
@@ -0,0 +1,140 @@
+import gzip
+import io
+import json
+import re
+from typing import Any, BinaryIO, Dict, Iterator, Optional, TextIO
+
+CHUNK_SIZE = 1 << 16
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_decoder = json.JSONDecoder()
+# Whitespace and the commas between array items; the opening "[" is consumed once.
+_SEPARATORS = re.compile(r"[\s,]*")
+# A value cut off at the end of the buffer fails to decode either as an unterminated
+# string or within a few characters of the end (a partial number, literal or escape).
+_TRUNCATED_TAIL = 16
+
+
+def _compression(magic: bytes) -> Optional[str]:
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Reading zstd-compressed logs requires the optional 'zstandard' package") from None
+    return zstandard
+
+
+def open_log_file(path: str) -> TextIO:
+    """
+    Open a log file from local disk for streaming.
+
+    gzip and zstd files are recognized by their magic bytes, whatever their
+    extension, and decompressed on the fly.
+    """
+    with open(path, "rb") as f:
+        compression = _compression(f.read(4))
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        return _zstandard().open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _may_be_truncated(error: json.JSONDecodeError, buf: str) -> bool:
+    """Whether reading more of the stream could make the value that failed to decode valid."""
+    return error.msg.startswith("Unterminated string") or len(buf) - error.pos <= _TRUNCATED_TAIL
+
+
+def iter_log_entries(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse log entries from a JSON array or NDJSON text stream.
+
+    The stream is read in chunks and decoded one entry at a time, so memory stays
+    bounded by the chunk size plus the largest single entry instead of the file size.
+    Invalid JSON raises ValueError with its line, column and character offset in
+    the stream as soon as it is seen.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    # Position in the stream of buf[0]: characters before it, its line and column
+    offset, line, column = 0, 1, 0
+
+    while True:
+        pos = _SEPARATORS.match(buf, pos).end()
+        if pos < len(buf) and not started:
+            started = True
+            if buf[pos] == "[":
+                pos += 1
+                continue
+        if pos < len(buf) and buf[pos] == "]":
+            return
+
+        if pos < len(buf):
+            try:
+                entry, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof or not _may_be_truncated(e, buf):
+                    colno = e.colno + column if e.lineno == 1 else e.colno
+                    raise ValueError(f"Invalid JSON log entry: {e.msg}: line {line + e.lineno - 1} "
+                                     f"column {colno} (char {offset + e.pos})") from None
+            else:
+                # A value ending exactly at the buffer edge may still be truncated.
+                if end < len(buf) or eof:
+                    if not isinstance(entry, dict):
+                        raise ValueError(f"Expected a JSON object per log entry, got {type(entry).__name__}")
+                    yield entry
+                    pos = end
+                    continue
+        elif eof:
+            return
+
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        consumed = buf[:pos]
+        newlines = consumed.count("\n")
+        line += newlines
+        column = pos - consumed.rfind("\n") - 1 if newlines else column + pos
+        offset += pos
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def iter_log_file(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream log entries from a JSON array or NDJSON file on local disk.
+    """
+    with open_log_file(path) as stream:
+        yield from iter_log_entries(stream, chunk_size)
+
+
+def iter_log_bytes(binary: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream log entries from a seekable binary file object, such as an upload.
+
+    Like open_log_file, gzip and zstd content is decompressed on the fly. The file
+    object is read from its current position and left open.
+    """
+    magic = binary.read(4)
+    binary.seek(-len(magic), io.SEEK_CUR)
+    compression = _compression(magic)
+    if compression == "gzip":
+        binary = gzip.GzipFile(fileobj=binary, mode="rb")
+    elif compression == "zstd":
+        binary = _zstandard().ZstdDecompressor().stream_reader(binary, closefd=False)
+    text = io.TextIOWrapper(binary, encoding="utf-8")
+    try:
+        yield from iter_log_entries(text, chunk_size)
+    finally:
+        text.detach()
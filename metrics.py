@@ -0,0 +1,131 @@
+import functools
+import json
+import os
+import time
+from contextlib import nullcontext
+from typing import Dict, Tuple
+
+PREFIX = "loganalyzer"
+
+_NULL_TIMER = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("metrics", "key", "started")
+
+    def __init__(self, metrics: "Metrics", key: Tuple):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.key, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """
+    Process-wide counters and stage timers with Prometheus text and JSON export.
+
+    When disabled, ``timer`` returns a shared no-op context manager and ``count`` /
+    ``observe`` return immediately, so instrumented code pays one attribute check.
+    Hot loops should test ``metrics.enabled`` themselves before building labels.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters: Dict[Tuple, float] = {}
+        self.timers: Dict[Tuple, list] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple:
+        return (name,) + tuple(sorted(labels.items()))
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        if self.enabled:
+            self._observe(self._key(name, labels), seconds)
+
+    def _observe(self, key: Tuple, seconds: float) -> None:
+        timer = self.timers.get(key)
+        if timer is None:
+            self.timers[key] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def timer(self, name: str, **labels: str):
+        """Time the enclosed block as one observation of ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, self._key(name, labels))
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.timers.clear()
+
+    def snapshot(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "counters": [
+                {"name": key[0], "labels": dict(key[1:]), "value": value}
+                for key, value in sorted(self.counters.items())
+            ],
+            "timers": [
+                {"name": key[0], "labels": dict(key[1:]), "count": count,
+                 "total_seconds": round(total, 6), "max_seconds": round(peak, 6)}
+                for key, (count, total, peak) in sorted(self.timers.items())
+            ]
+        }
+
+    def to_prometheus(self) -> str:
+        def labels(key):
+            if len(key) == 1:
+                return ""
+            return "{" + ",".join(f'{name}="{value}"' for name, value in key[1:]) + "}"
+
+        lines = []
+        for key, value in sorted(self.counters.items()):
+            lines.append(f"{PREFIX}_{key[0]}_total{labels(key)} {value}")
+        for key, (count, total, peak) in sorted(self.timers.items()):
+            lines.append(f"{PREFIX}_{key[0]}_seconds_count{labels(key)} {count}")
+            lines.append(f"{PREFIX}_{key[0]}_seconds_sum{labels(key)} {total:.6f}")
+            lines.append(f"{PREFIX}_{key[0]}_seconds_max{labels(key)} {peak:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics(enabled=os.getenv("LOG_ANALYZER_METRICS", "0").lower() in ("1", "true", "yes"))
+
+
+def instrumented(fn):
+    """
+    Record call count, duration and JSON payload sizes of an MCP tool in METRICS.
+
+    Payload sizes are measured by re-serializing the arguments and the result,
+    which only happens while metrics are enabled.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        METRICS.observe("tool", time.perf_counter() - started, tool=name)
+        METRICS.count("tool_calls", tool=name)
+        METRICS.count("payload_bytes", len(json.dumps([args, kwargs], default=str)), tool=name, direction="in")
+        METRICS.count("payload_bytes", len(json.dumps(result, default=str)), tool=name, direction="out")
+        return result
+
+    return wrapper
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import time
+
+import streamlit as st
+
+from batch_analysis import DEFAULT_WORKERS, LLM_CONCURRENCY, BatchSummary, expand_paths, stream_files
+from ui_resources import get_session_pool
+
+if 'batch' not in st.session_state:
+    st.session_state.batch = None
+
+MODES = {
+    "Local rules only": "rules",
+    "Local rules (escalate unknown issues to the agent)": "local",
+    "Agent (LLM) for every file": "agent",
+}
+
+st.title('📦 Batch Log Analysis')
+st.markdown("Analyze many log files at once: results appear as each file finishes, followed by a summary "
+            "merged across all files.")
+
+
+def file_row(result, name):
+    summary = result["summary"] or {}
+    return {
+        "file": name,
+        "status": "✅" if result["status"] == "ok" else "❌",
+        "entries": summary.get("total_logs"),
+        "errors": summary.get("error_count"),
+        "warnings": summary.get("warning_count"),
+        "seconds": round(result["seconds"], 2),
+        "error": result["error"] or ""
+    }
+
+
+def display_file_result(result):
+    """Suggestions of a local run, or the agent's final answer"""
+    outcome = result["result"]
+    if result["error"]:
+        st.error(result["error"])
+    elif isinstance(outcome, dict) and outcome.get("mode") == "local":
+        for suggestion in outcome["suggestions"]:
+            st.write(suggestion)
+        escalation = outcome.get("escalation")
+        if isinstance(escalation, dict) and escalation.get("messages"):
+            st.success(f"🤖 **AI:** {getattr(escalation['messages'][-1], 'content', escalation['messages'][-1])}")
+    elif isinstance(outcome, dict) and outcome.get("messages"):
+        st.success(f"🤖 **AI:** {getattr(outcome['messages'][-1], 'content', outcome['messages'][-1])}")
+
+
+def display_batch(batch):
+    merged = batch["summary"]
+    totals = merged["summary"]
+    st.subheader("🧮 Merged Summary")
+    cols = st.columns(5)
+    cols[0].metric("Files", merged["files"])
+    cols[1].metric("Failed", len(merged["failed"]))
+    cols[2].metric("Log entries", totals["total_logs"])
+    cols[3].metric("Errors", totals["error_count"], help=f"{totals['distinct_errors']} distinct")
+    cols[4].metric("Warnings", totals["warning_count"], help=f"{totals['distinct_warnings']} distinct")
+    st.caption(f"Wall time {batch['seconds']:.2f} s for {merged['file_seconds']:.2f} s of per-file work.")
+
+    for kind in ("errors", "warnings"):
+        if merged[kind]:
+            st.markdown(f"**{kind.capitalize()} across files**")
+            st.dataframe([{"count": group["count"], "component": group["component"], "fingerprint": group["fingerprint"],
+                           "files": len(group["files"]), "first_seen": group["first_seen"], "last_seen": group["last_seen"]}
+                          for group in merged[kind]], use_container_width=True, hide_index=True)
+
+    st.subheader("📄 Per-file Results")
+    st.dataframe(batch["rows"], use_container_width=True, hide_index=True)
+    # Keyed by path: uploads of the same name are analyzed from distinct temporary files
+    path = st.selectbox("Details for", list(batch["results"]), format_func=lambda path: batch["results"][path]["name"])
+    if path:
+        display_file_result(batch["results"][path])
+
+
+patterns = st.text_area("Files, directories or glob patterns on the server, one per line",
+                        placeholder="Test logs/*.json\n/var/log/app/**/*.ndjson.gz")
+uploads = st.file_uploader("...or upload several log files", type=['json', 'ndjson', 'jsonl', 'gz', 'zst'],
+                           accept_multiple_files=True)
+mode = MODES[st.radio("Analysis mode", list(MODES))]
+cols = st.columns(2)
+workers = cols[0].slider("Workers", 1, 32, DEFAULT_WORKERS, help="Files analyzed concurrently")
+llm_concurrency = cols[1].slider("Concurrent LLM calls", 1, 16, LLM_CONCURRENCY, disabled=mode == "rules",
+                                 help="Agent runs in flight at once over the shared MCP session")
+
+if st.button("🚀 Analyze files"):
+    with tempfile.TemporaryDirectory() as upload_dir:
+        paths = expand_paths(line.strip() for line in patterns.splitlines() if line.strip())
+        names = {path: path for path in paths}
+        for i, upload in enumerate(uploads or []):
+            path = os.path.join(upload_dir, f"{i}_{upload.name}")
+            with open(path, "wb") as f:
+                shutil.copyfileobj(upload, f)
+            paths.append(path)
+            names[path] = upload.name
+
+        if not paths:
+            st.warning("⚠️ No log files found")
+        else:
+            started = time.perf_counter()
+            progress = st.progress(0.0, text=f"0/{len(paths)} files")
+            table = st.empty()
+            rows, results = [], {}
+            summary = BatchSummary()
+            pool = get_session_pool() if mode != "rules" else None
+            try:
+                for result in stream_files(paths, pool, mode, workers, llm_concurrency):
+                    summary.add(result)
+                    name = names[result["path"]]
+                    rows.append(file_row(result, name))
+                    results[result["path"]] = {"name": name,
+                                               **{key: value for key, value in result.items() if key != "state"}}
+                    progress.progress(len(rows) / len(paths), text=f"{len(rows)}/{len(paths)} files")
+                    table.dataframe(rows, use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"❌ Batch analysis failed: {e}")
+            table.empty()
+            st.session_state.batch = {"rows": rows, "results": results, "summary": summary.result(),
+                                      "seconds": time.perf_counter() - started}
+
+if st.session_state.batch is not None:
+    display_batch(st.session_state.batch)
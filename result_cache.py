@@ -0,0 +1,119 @@
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Optional
+
+CACHE_DIR = os.getenv("LOG_ANALYZER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results"))
+CACHE_MAX_BYTES = int(float(os.getenv("LOG_ANALYZER_CACHE_MAX_MB", "256")) * 1024 * 1024)
+CACHE_TTL = float(os.getenv("LOG_ANALYZER_CACHE_TTL", str(24 * 3600)))
+
+# Libraries whose message classes end up pickled in cached agent results
+PICKLED_LIBRARIES = ("langchain-core", "langgraph")
+
+
+def library_versions(names=PICKLED_LIBRARIES) -> str:
+    """Installed versions of ``names`` for a cache key, so an upgrade stops matching entries pickled before it."""
+    versions = []
+    for name in names:
+        try:
+            versions.append(f"{name}=={importlib.metadata.version(name)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{name}==none")
+    return ",".join(versions)
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of analysis results.
+
+    Entries are keyed by the hash of the uploaded log bytes plus anything else the
+    result depends on (analysis mode, analyzer rule-set version), so a change to the
+    rules simply stops matching old entries. Reads refresh an entry's modification
+    time; writes evict the least recently used entries beyond ``max_bytes`` and
+    entries older than ``ttl`` seconds are treated as misses.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES, ttl: float = CACHE_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(content: bytes, *parts: str) -> str:
+        digest = hashlib.sha256(content)
+        for part in parts:
+            digest.update(b"\0" + part.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                created, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated, corrupt, or pickled against classes that have since changed
+            self._remove(path)
+            return None
+        if time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently used ones until under max_bytes."""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,172 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Frames kept per trace and frames that make up its grouping signature.
+TOP_FRAMES = 5
+SIGNATURE_FRAMES = 3
+TRACE_CACHE_SIZE = int(os.getenv("LOG_ANALYZER_TRACE_CACHE", "4096"))
+
+_PY_FRAME = re.compile(r'^\s*File "(?P<file>[^"]+)", line \d+(?:, in (?P<func>\S+))?')
+_PY_EXCEPTION = re.compile(r"^(?P<type>[A-Za-z_][\w.]*)(?::\s*(?P<message>.*))?$")
+_PY_CHAIN = ("The above exception was the direct cause", "During handling of the above exception")
+# "at pkg.Class.method(File.java:12)", "at Ns.Class.Method(String s) in C:\src\File.cs:line 12", "at File.java:12"
+_AT_FRAME = re.compile(r"^\s*at\s+(?P<frame>[^\s(]+)")
+_INLINE_AT = re.compile(r"\s+at\s+(?P<frame>[^\s(]+)(?:\([^)]*\))?\s*$")
+_EXCEPTION_LINE = re.compile(r'^(?:Exception in thread "[^"]*"\s+)?(?P<type>[A-Za-z_$][\w$.`]*)(?::\s*(?P<message>.*))?$')
+_CAUSE = re.compile(r"^\s*(?:Caused by:|--->)\s*(?P<type>[A-Za-z_$][\w$.`]*)(?::\s*(?P<message>.*))?$")
+_LINE_NUMBER = re.compile(r":\d+$")
+# What a bare "Type: message" line needs to count as an exception: a dotted type or an ...Exception/...Error name
+_EXCEPTION_NAME = re.compile(r"\.|\w(?:Exception|Error)$")
+_JAVA_HINT = re.compile(r"^(?:javax?\.|Exception in thread )|\.java:\d+|^\s*at |^Caused by:", re.MULTILINE)
+
+
+class StackTrace(NamedTuple):
+    language: str
+    exception_type: str
+    message: str
+    frames: Tuple[str, ...]
+    root_cause: Optional[str]
+    signature: str
+
+
+def _trace(language: str, exception: Tuple[str, str], frames: List[str], causes: List[Tuple[str, str]]) -> StackTrace:
+    """
+    Frames are the top frames, innermost call first, without line numbers, so
+    traces of the same code path share a signature whatever the line numbers.
+    """
+    frames = tuple(frames[:TOP_FRAMES])
+    signature = exception[0]
+    if frames:
+        signature += " @ " + " < ".join(frames[:SIGNATURE_FRAMES])
+    root_cause = None
+    if causes:
+        root_cause = f"{causes[-1][0]}: {causes[-1][1]}" if causes[-1][1] else causes[-1][0]
+        signature += " <- " + causes[-1][0]
+    return StackTrace(language, exception[0], exception[1], frames, root_cause, signature)
+
+
+def _parse_python(lines: List[str]) -> Optional[StackTrace]:
+    # Chained tracebacks print the original exception first and the one raised last at the end
+    exceptions = []
+    frames = []
+    expect_exception = False
+    for line in lines:
+        if line.startswith("Traceback"):
+            frames = []
+            expect_exception = True
+            continue
+        match = _PY_FRAME.match(line)
+        if match:
+            frames.append(f"{os.path.basename(match['file'])}:{match['func'] or '?'}")
+            continue
+        if line[0].isspace() or line.startswith(_PY_CHAIN) or not expect_exception:
+            continue
+        match = _PY_EXCEPTION.match(line)
+        if match:
+            exceptions.append((match["type"], match["message"] or ""))
+            expect_exception = False
+    if not exceptions:
+        return None
+    return _trace("python", exceptions[-1], frames[::-1], exceptions[:1] if len(exceptions) > 1 else [])
+
+
+def _parse_jvm(trace: str, lines: List[str]) -> Optional[StackTrace]:
+    """Java and .NET: the exception line first, then "at" frames and "Caused by:" / "--->" causes."""
+    if " ---> " in trace or ":line " in trace or lines[0].startswith("System."):
+        language = "dotnet"
+    elif _JAVA_HINT.search(trace):
+        language = "java"
+    else:
+        # A bare "Type: message" line, e.g. from a Python or Node.js logger
+        language = "unknown"
+    head, *inner = lines[0].split(" ---> ")
+    frames = []
+    inline = _INLINE_AT.search(head)
+    if inline:
+        # One-line traces such as "java.lang.NullPointerException at AuthService.java:42"
+        frames.append(_LINE_NUMBER.sub("", inline["frame"]))
+        head = head[:inline.start()]
+    match = _EXCEPTION_LINE.match(head.strip())
+    if not match:
+        return None
+    causes = [(cause["type"], cause["message"] or "") for cause in map(_CAUSE.match, ("---> " + text for text in inner))
+              if cause]
+
+    inline_frames = len(frames)
+    for line in lines[1:]:
+        frame = _AT_FRAME.match(line)
+        if frame:
+            if not causes or language == "dotnet":
+                frames.append(_LINE_NUMBER.sub("", frame["frame"]))
+            continue
+        cause = _CAUSE.match(line)
+        if cause:
+            causes.append((cause["type"], cause["message"] or ""))
+    if (language == "unknown" and len(frames) == inline_frames and not causes
+            and not _EXCEPTION_NAME.search(match["type"])):
+        # e.g. "null", "none", "Error" or "timeout" in the stack_trace field
+        return None
+    return _trace(language, (match["type"], match["message"] or ""), frames, causes)
+
+
+@lru_cache(maxsize=TRACE_CACHE_SIZE)
+def parse_stack_trace(trace: str) -> Optional[StackTrace]:
+    """
+    Parse a Java, Python or .NET stack trace into exception type, message, top
+    frames and root cause, or None if it doesn't look like a trace.
+
+    Results are memoized in a bounded LRU keyed by the trace text (looked up by its
+    hash), since the same trace repeats thousands of times during an incident.
+    """
+    lines = [line.rstrip() for line in trace.strip().splitlines() if line.strip()]
+    if not lines:
+        return None
+    if lines[0].startswith("Traceback") or _PY_FRAME.match(lines[0]):
+        return _parse_python(lines)
+    return _parse_jvm(trace, lines)
+
+
+class TraceGroups:
+    """
+    Errors grouped by the signature of their stack trace: exception type, top
+    frames and root cause type. Errors without a parseable trace are not grouped.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, Dict] = {}
+
+    def add(self, trace: str, component: str, count: int = 1) -> None:
+        parsed = parse_stack_trace(trace) if trace else None
+        if parsed is None:
+            return
+        group = self.groups.get(parsed.signature)
+        if group is None:
+            group = self.groups[parsed.signature] = {
+                "signature": parsed.signature,
+                "language": parsed.language,
+                "exception_type": parsed.exception_type,
+                "message": parsed.message,
+                "root_cause": parsed.root_cause,
+                "top_frames": list(parsed.frames),
+                "count": 0,
+                "components": []
+            }
+        group["count"] += count
+        if component not in group["components"]:
+            group["components"].append(component)
+
+    def merge(self, groups: Dict[str, Dict]) -> None:
+        """Fold in the groups of a TraceGroups that saw the entries following ours."""
+        for signature, other in groups.items():
+            group = self.groups.get(signature)
+            if group is None:
+                self.groups[signature] = dict(other, components=list(other["components"]))
+                continue
+            group["count"] += other["count"]
+            group["components"].extend(component for component in other["components"]
+                                       if component not in group["components"])
+
+    def result(self) -> List[Dict]:
+        return sorted(self.groups.values(), key=lambda group: -group["count"])
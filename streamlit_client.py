@@ -1,17 +1,26 @@
 import traceback
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+import asyncio
 import os
 import json
+import tempfile
+import threading
+import time
 
 # MCP Client Imports
 from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp.client.stdio import get_default_environment, stdio_client
 
 # Langchain Imports
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.prebuilt import create_react_agent
 from langchain_anthropic import ChatAnthropic
 
+from log_digest import estimate_tokens
+from metrics import METRICS
+from warm_server import socket_client
+
 
 class CustomEncoder(json.JSONEncoder):
     def default(self, o):
@@ -34,65 +43,438 @@ def read_config_json():
         return json.load(f)
 
 
-async def run_agent(logs):
+def build_prompt(logs=None, path=None, batch=None, token_budget=None):
+    """
+    Prompt with a token-budgeted digest of the logs instead of the logs themselves.
+
+    The digest is built from ``batch``, ``logs`` or the file at ``path``. When a path
+    is given the agent is pointed at the file tools for whatever the digest left out.
+    Returns (prompt, digest stats).
+    """
+    from analyzer import LogBatch
+    from log_digest import DEFAULT_TOKEN_BUDGET, build_digest
+    from log_stream import iter_log_file
+
+    if batch is None:
+        batch = LogBatch(logs if logs is not None else iter_log_file(path))
+    digest, stats = build_digest(batch, token_budget or DEFAULT_TOKEN_BUDGET)
+    prompt = ("Please analyze these logs and suggest fixes. Below is a digest: counts per level and component, "
+              "and errors and warnings grouped by signature (the message with numbers, IDs and timestamps "
+              "replaced by placeholders) with occurrence counts.\n\n" + digest)
+    if path is not None:
+        # The server reads the file itself, so only the path goes through the prompt.
+        prompt += (f"\n\nThe full log file is at {path}. For details the digest leaves out, call analyze_log_file "
+                   "with this path, then get_log_file_groups to page through the grouped errors, warnings or "
+                   "stack traces, get_log_file_issues for individual entries and query_log_window for time windows.")
+    return prompt, stats
+
+
+@contextmanager
+def spill_logs(logs):
+    """Write inline logs to a temporary NDJSON file the MCP server can read, removed on exit."""
+    with tempfile.NamedTemporaryFile("w", suffix=".ndjson", encoding="utf-8", delete=False) as tmp:
+        for log in logs:
+            tmp.write(json.dumps(log) + "\n")
+    try:
+        yield tmp.name
+    finally:
+        os.remove(tmp.name)
+
+
+def create_llm():
     # OpenAI GPT 4 LLM Integration
-    llm = ChatAnthropic(
+    return ChatAnthropic(
         model='claude-sonnet-4-20250514',
         temperature=0,
         max_retries=2,
         anthropic_api_key='Your-API-Key'
     )
 
-    configu = read_config_json()
-    mcp_servers = configu.get('mcpServers', {})
 
-    try:
-        async with AsyncExitStack() as stack:
-            tools = []
-            for server_name, server_info in mcp_servers.items():
-                print(f"🔌 Connecting to MCP server")
+def server_environment(server_info):
+    """Environment for an MCP server subprocess; forwards the metrics switch so both sides agree."""
+    env = server_info.get('env')
+    if env is None and METRICS.enabled:
+        env = get_default_environment()
+    if METRICS.enabled:
+        env = {**env, "LOG_ANALYZER_METRICS": "1"}
+    return env
+
+
+async def connect_mcp_servers(stack, mcp_servers, timings=None):
+    """
+    Start every configured MCP server on ``stack`` and return (sessions, tools).
+
+    Servers configured with a ``socket`` address instead of a command are already
+    running (see warm_server.py) and are connected to rather than spawned.
+    Startup and tool-loading durations are added to ``timings`` when given.
+    """
+    sessions = {}
+    tools = []
+    timings = timings if timings is not None else {}
+    for server_name, server_info in mcp_servers.items():
+        print(f"🔌 Connecting to MCP server")
 
+        try:
+            started = time.perf_counter()
+            if 'socket' in server_info:
+                read, write = await stack.enter_async_context(socket_client(server_info['socket']))
+            else:
                 server_params = StdioServerParameters(
                     command=server_info['command'],
-                    args=server_info['args']
+                    args=server_info['args'],
+                    env=server_environment(server_info)
                 )
+                read, write = await stack.enter_async_context(stdio_client(server_params))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            print("✅ MCP subprocess started, waiting for session initialization...")
+            await session.initialize()
+            loaded = time.perf_counter()
+            server_tools = await load_mcp_tools(session)
+            timings["mcp_startup"] = timings.get("mcp_startup", 0.0) + loaded - started
+            timings["load_tools"] = timings.get("load_tools", 0.0) + time.perf_counter() - loaded
+            METRICS.observe("client_stage", loaded - started, stage="mcp_startup")
+            METRICS.observe("client_stage", time.perf_counter() - loaded, stage="load_tools")
+        except Exception as e:
+            print(f"🚨 MCP Connection Failed for {server_name}")
+            traceback.print_exception(type(e), e, e.__traceback__)
+            raise e
 
-                try:
-                    read, write = await stack.enter_async_context(stdio_client(server_params))
-                    session = await stack.enter_async_context(ClientSession(read, write))
-                    print("✅ MCP subprocess started, waiting for session initialization...")
-                    await session.initialize()
-                    server_tools = await load_mcp_tools(session)
-                except Exception as e:
-                    print(f"🚨 MCP Connection Failed for {server_name}")
-                    traceback.print_exception(type(e), e, e.__traceback__)
-                    raise e
+        for tool in server_tools:
+            print(f"✅ Loaded tool: {tool.name}")
+            tools.append(tool)
 
-                for tool in server_tools:
-                    print(f"✅ Loaded tool: {tool.name}")
-                    tools.append(tool)
+        sessions[server_name] = session
+        print(f"📦 {len(server_tools)} tools loaded from {server_name}.")
 
-                print(f"📦 {len(server_tools)} tools loaded from {server_name}.")
+    return sessions, tools
 
-            agent = create_react_agent(llm, tools)
 
-            try:
-                print("🤖 Invoking agent...")
-                response = await agent.ainvoke({
-                    "messages": [
-                        {"role": "user",
-                         "content": f"Please analyze these logs: {json.dumps(logs, indent=2)} and suggest fixes."}
-                    ]
-                })
-                print("✅ Agent response received")
-                return response
+async def run_agent(logs=None, path=None, batch=None):
+    """One-shot analysis: starts the MCP servers, runs the agent and shuts everything down."""
+    llm = create_llm()
 
-            except Exception as e:
-                print("❌ Agent invocation failed:", e)
-                traceback.print_exc()
-                return {"error": "Agent invocation failed", "details": traceback.format_exc()}
+    configu = read_config_json()
+    mcp_servers = configu.get('mcpServers', {})
+
+    try:
+        async with AsyncExitStack() as stack:
+            if path is None:
+                # On disk, the agent can page through the logs with the file tools
+                path = stack.enter_context(spill_logs(logs))
+            prompt, digest = build_prompt(logs, path, batch)
+            timings = {"prompt_digest": digest}
+            _, tools = await connect_mcp_servers(stack, mcp_servers, timings)
+            agent = create_react_agent(llm, tools)
+            return await invoke_agent(agent, prompt, timings)
 
     except Exception as e:
         print("🚨 Unexpected exception in run_agent()")
         traceback.print_exc()
         return {"error": str(e), "details": traceback.format_exc()}
+
+
+class TimingCallback(BaseCallbackHandler):
+    """Times every LLM turn and tool call of one agent run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started = {}
+        self.llm_seconds = []
+        self.tool_seconds = {}
+        self.tool_result_bytes = 0
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        if run_id in self.started:
+            self.llm_seconds.append(time.perf_counter() - self.started.pop(run_id))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self.started[run_id] = (time.perf_counter(), (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        if run_id in self.started:
+            started, name = self.started.pop(run_id)
+            self.tool_seconds[name] = self.tool_seconds.get(name, 0.0) + time.perf_counter() - started
+        self.tool_result_bytes += len(str(getattr(output, "content", output)).encode("utf-8"))
+
+
+async def invoke_agent(agent, prompt, timings=None):
+    """
+    Run the agent on ``prompt``. The response carries a "timings" breakdown of the
+    request: connection stages passed in ``timings``, each LLM turn, each tool and
+    the prompt and tool-result sizes.
+    """
+    timings = dict(timings or {})
+    callback = TimingCallback()
+    try:
+        print("🤖 Invoking agent...")
+        started = time.perf_counter()
+        response = await agent.ainvoke({
+            "messages": [
+                {"role": "user",
+                 "content": prompt}
+            ]
+        }, config={"callbacks": [callback]})
+        print("✅ Agent response received")
+
+        timings.update({
+            "agent": time.perf_counter() - started,
+            "llm": sum(callback.llm_seconds),
+            "llm_turns": len(callback.llm_seconds),
+            "tools": callback.tool_seconds,
+            "prompt_bytes": len(prompt.encode("utf-8")),
+            "prompt_tokens": estimate_tokens(prompt),
+            "tool_result_bytes": callback.tool_result_bytes
+        })
+        METRICS.observe("client_stage", timings["agent"], stage="agent")
+        for seconds in callback.llm_seconds:
+            METRICS.observe("client_stage", seconds, stage="llm_turn")
+        METRICS.count("prompt_bytes", timings["prompt_bytes"])
+        METRICS.count("prompt_tokens", timings["prompt_tokens"])
+        METRICS.count("tool_result_bytes", timings["tool_result_bytes"])
+        if isinstance(response, dict):
+            response["timings"] = timings
+        return response
+
+    except Exception as e:
+        print("❌ Agent invocation failed:", e)
+        traceback.print_exc()
+        return {"error": "Agent invocation failed", "details": traceback.format_exc()}
+
+
+def token_usage(response):
+    """Sum the token usage reported on the AI messages of an agent response."""
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    for message in response.get("messages", []):
+        metadata = getattr(message, "usage_metadata", None) or {}
+        for key in usage:
+            usage[key] += metadata.get(key, 0)
+    return usage
+
+
+def build_escalation_prompt(unresolved):
+    issues = {
+        kind: [{key: group.get(key) for key in ("component", "message", "count", "first_seen", "last_seen")}
+               for group in groups]
+        for kind, groups in unresolved.items() if groups
+    }
+    return ("The rule-based log analyzer found no specific fix for the following grouped issues. "
+            f"Suggest concrete fixes for each: {json.dumps(issues, separators=(',', ':'))}")
+
+
+def local_rules(logs=None, path=None, batch=None):
+    """
+    The rules pass of analyze_local, without escalation: CPU-bound, safe to run in a worker thread.
+
+    Issues that only matched the generic fallback rules are listed under "unresolved".
+    """
+    from analyzer import (ERROR_FALLBACK, WARNING_FALLBACK, LogBatch, analyze_logs,
+                          match_error_rule, match_warning_rule, suggest_fix)
+    from log_stream import iter_log_file
+
+    started = time.perf_counter()
+    if batch is None and path is not None:
+        batch = LogBatch(iter_log_file(path))
+    if batch is not None:
+        analysis = batch.result()
+    else:
+        analysis = analyze_logs(logs)
+    suggestions = suggest_fix(analysis)
+    unresolved = {
+        "errors": [group for group in analysis["errors"]
+                   if match_error_rule(group["message"], group["component"])[0] == ERROR_FALLBACK[0]],
+        "warnings": [group for group in analysis["warnings"]
+                     if match_warning_rule(group["message"], group["component"])[0] == WARNING_FALLBACK[0]]
+    }
+    metrics = {"mode": "local", "local_seconds": time.perf_counter() - started,
+               "llm_seconds": 0.0, "input_tokens": 0, "output_tokens": 0,
+               "escalated_issues": len(unresolved["errors"]) + len(unresolved["warnings"])}
+
+    return {
+        "mode": "local",
+        "analysis": analysis,
+        "suggestions": suggestions,
+        "unresolved": unresolved,
+        "escalation": None,
+        "metrics": metrics
+    }
+
+
+def add_escalation(result, escalation, llm_seconds):
+    """Record the agent's answer for the unresolved issues of a local_rules result."""
+    result["escalation"] = escalation
+    result["metrics"]["llm_seconds"] = llm_seconds
+    if isinstance(escalation, dict) and "messages" in escalation:
+        result["metrics"].update(token_usage(escalation))
+    return result
+
+
+def analyze_local(logs=None, path=None, escalate=None, batch=None):
+    """
+    Analyze logs in-process with the analyzer rules and escalate only what they can't explain.
+
+    The logs are given as a list of entries, a file path or an already parsed
+    analyzer ``LogBatch``.
+
+    Issues that fall through to the generic "General" / "Monitoring" suggestions are
+    sent to ``escalate(prompt)`` (usually the agent); everything else is answered
+    locally without an LLM call.
+    """
+    result = local_rules(logs=logs, path=path, batch=batch)
+    if escalate is not None and result["metrics"]["escalated_issues"]:
+        started = time.perf_counter()
+        escalation = escalate(build_escalation_prompt(result["unresolved"]))
+        add_escalation(result, escalation, time.perf_counter() - started)
+    return result
+
+
+class MCPSessionPool:
+    """
+    Long-lived MCP sessions, tools and agent shared by every analysis request.
+
+    Everything runs on one background event loop thread. A single owner task
+    enters the stdio/session contexts and is the only one to exit them (anyio
+    requires this); requests from any thread are scheduled onto the loop, ping
+    the servers first and trigger a reconnect when a subprocess has died.
+    """
+
+    HEALTH_CHECK_TIMEOUT = 5
+    RECONNECT_DELAY = 1
+
+    def __init__(self, mcp_servers=None):
+        self.mcp_servers = mcp_servers if mcp_servers is not None else read_config_json().get('mcpServers', {})
+        self.llm = create_llm()
+        self.sessions = {}
+        self.tools = []
+        self.agent = None
+        self.connect_timings = {}
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="mcp-session-pool", daemon=True)
+        self._thread.start()
+        self._owner = None
+        self._ready = None
+        self._reset = None
+        self._error = None
+        self._closing = False
+
+    def run(self, coro, timeout=None):
+        """Run ``coro`` on the pool's event loop from any thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def analyze(self, logs=None, path=None, batch=None):
+        """Run the agent on ``logs`` or on the file at ``path`` (parsed as ``batch``, if given) over the pooled session."""
+        return self.run(self.run_agent(logs=logs, path=path, batch=batch))
+
+    def close(self):
+        self.run(self._shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+    def analyze_local(self, logs=None, path=None, batch=None):
+        """Rules-first analysis that only escalates fallback issues to the agent."""
+        return analyze_local(logs=logs, path=path, batch=batch,
+                             escalate=lambda prompt: self.run(self.run_prompt(prompt)))
+
+    async def run_agent(self, logs=None, path=None, batch=None):
+        with ExitStack() as stack:
+            if path is None:
+                path = stack.enter_context(spill_logs(logs))
+            # Off the event loop: digesting a large file must not stall other requests
+            prompt, digest = await asyncio.to_thread(build_prompt, logs, path, batch)
+            return await self.run_prompt(prompt, {"prompt_digest": digest})
+
+    def server_metrics(self, format="json"):
+        """Fetch the get_metrics output of every connected MCP server."""
+        return self.run(self._server_metrics(format))
+
+    async def _server_metrics(self, format):
+        await self._ensure_connected()
+        metrics = {}
+        for server_name, session in self.sessions.items():
+            result = await session.call_tool("get_metrics", {"format": format})
+            metrics[server_name] = "".join(getattr(block, "text", "") for block in result.content)
+        return metrics
+
+    async def run_prompt(self, prompt, timings=None):
+        started = time.perf_counter()
+        connect_timings = self.connect_timings
+        try:
+            await self._ensure_connected()
+        except Exception as e:
+            print("🚨 Unexpected exception in MCPSessionPool.run_prompt()")
+            traceback.print_exc()
+            return {"error": str(e), "details": traceback.format_exc()}
+        timings = {**(timings or {}), "mcp_connect": time.perf_counter() - started}
+        if self.connect_timings is not connect_timings:
+            # The servers were (re)started for this request
+            timings.update(self.connect_timings)
+        response = await invoke_agent(self.agent, prompt, timings)
+        if isinstance(response, dict) and "messages" in response:
+            response["metrics"] = {"mode": "agent", "llm_seconds": time.perf_counter() - started,
+                                   **token_usage(response)}
+        return response
+
+    async def _ensure_connected(self):
+        if self._owner is None or self._owner.done():
+            self._ready = asyncio.Event()
+            self._reset = asyncio.Event()
+            self._owner = asyncio.ensure_future(self._own_connection())
+        await self._ready.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if not await self._healthy():
+            print("♻️ MCP server not responding, reconnecting...")
+            self._ready.clear()
+            self._reset.set()
+            await self._ready.wait()
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+
+    async def _healthy(self):
+        try:
+            for session in self.sessions.values():
+                await asyncio.wait_for(session.send_ping(), self.HEALTH_CHECK_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+    async def _own_connection(self):
+        while not self._closing:
+            connected = False
+            try:
+                async with AsyncExitStack() as stack:
+                    self.connect_timings = {}
+                    self.sessions, self.tools = await connect_mcp_servers(stack, self.mcp_servers, self.connect_timings)
+                    self.agent = create_react_agent(self.llm, self.tools)
+                    connected = True
+                    self._ready.set()
+                    await self._reset.wait()
+            except Exception as e:
+                if not connected:
+                    self._error = e
+                    self._ready.set()
+                    return
+                # A dead subprocess usually surfaces here while tearing down its streams
+                print("⚠️ MCP session closed with an error:", e)
+            finally:
+                self.sessions, self.tools, self.agent = {}, [], None
+
+            self._ready.clear()
+            self._reset.clear()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    async def _shutdown(self):
+        self._closing = True
+        if self._owner is not None and not self._owner.done():
+            self._reset.set()
+            await self._owner
@@ -1,19 +1,207 @@
 import nest_asyncio
 import streamlit as st
-import asyncio
+import hashlib
 import json
+import math
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from ui_resources import get_session_pool
 
 nest_asyncio.apply()
 
 if 'result' not in st.session_state:
     st.session_state.result = None
+if 'mode_metrics' not in st.session_state:
+    st.session_state.mode_metrics = {}
+if 'tailers' not in st.session_state:
+    st.session_state.tailers = {}
+if 'views' not in st.session_state:
+    st.session_state.views = {}
 
 st.title('MCP Log Analyzer')
-st.markdown("Upload a JSON log file to analyze errors and receive fixes.")
+st.markdown("Upload a JSON or NDJSON log file (optionally gzip or zstd compressed) to analyze errors and receive fixes.")
+
+PREVIEW_ENTRIES = 2
+MESSAGES_PER_PAGE = 10
+ISSUES_PER_PAGE = 50
+MAX_PAYLOAD_CHARS = 20000
+ISSUE_COLUMNS = ("component", "count", "fingerprint", "message", "timestamp", "first_seen", "last_seen")
+
+
+@st.cache_resource
+def get_result_cache():
+    from result_cache import ResultCache
+
+    return ResultCache()
+
+
+@st.cache_resource(max_entries=4)
+def load_upload(content_hash, _uploaded_file):
+    """
+    Parse an upload once per distinct content, in a single streaming pass.
+
+    Entries go straight into a columnar LogBatch and only the first few are kept as
+    dicts for the preview, so the upload is never decoded or parsed as a whole.
+    """
+    from analyzer import LogBatch
+    from log_stream import iter_log_bytes
+
+    preview = []
+
+    def entries():
+        for entry in iter_log_bytes(_uploaded_file):
+            if len(preview) < PREVIEW_ENTRIES:
+                preview.append(entry)
+            yield entry
+
+    _uploaded_file.seek(0)
+    return LogBatch(entries()), preview
+
+
+@st.cache_resource(max_entries=8)
+def get_log_index(content_hash, _batch):
+    """Time index of an upload, built once per distinct file content"""
+    from log_index import LogIndex
+
+    return LogIndex.from_batch(_batch)
+
+
+def display_time_drilldown(index):
+    """Window counts, rate of change, top components and histogram from the time index"""
+    if index.start is None or index.end - index.start <= 60:
+        st.info("ℹ️ Not enough timestamped entries for a time drill-down")
+        return
+
+    first = datetime.fromtimestamp(index.start, timezone.utc)
+    last = datetime.fromtimestamp(index.end, timezone.utc)
+    window = st.slider("Time window (UTC)", min_value=first, max_value=last, value=(first, last),
+                       step=timedelta(minutes=1), format="MM/DD HH:mm")
+    cols = st.columns(2)
+    component = cols[0].selectbox("Component", ["All components"] + index.components)
+    bucket_minutes = cols[1].number_input("Bucket size (minutes)", min_value=1, max_value=1440, value=1)
+    if window[1] <= window[0]:
+        st.info("ℹ️ Select a window with its end after its start")
+        return
+
+    result = index.query(int(window[0].timestamp()), int(window[1].timestamp()),
+                         None if component == "All components" else component, "ERROR", 5, bucket_minutes)
+    counts = result["counts"]
+    change = result["change"]
+    cols = st.columns(3)
+    cols[0].metric("Entries", counts["total"], delta=change["total"])
+    cols[1].metric("Errors", counts["errors"], delta=change["errors"], delta_color="inverse")
+    cols[2].metric("Warnings", counts["warnings"], delta=change["warnings"], delta_color="inverse")
+    st.caption("Deltas compare with the preceding window of the same length.")
+
+    if result["histogram"]:
+        st.bar_chart(result["histogram"], x="start", y=["errors", "warnings"])
+    if result["top_components"]:
+        st.markdown("**Top components by errors**")
+        st.table(result["top_components"])
 
 
-def display_results(result):
-    """Display the agent results in a clear format"""
+def message_view(message):
+    """
+    Flatten one agent message into what the results view renders.
+
+    Done once per result: tool payloads are parsed here, and those holding
+    errors/warnings lists are turned into table rows, so reruns only slice.
+    """
+    if hasattr(message, 'content'):
+        # LangChain message object
+        message_type = type(message).__name__
+        content = message.content
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        role = next((role for role in ("Human", "AI", "Tool") if role in message_type), message_type)
+        name = getattr(message, 'name', None) or 'Unknown Tool'
+    elif isinstance(message, dict):
+        role, name, content = "dict", None, json.dumps(message, default=str)
+    else:
+        role, name, content = "other", None, str(message)
+
+    rows = None
+    if role in ("Tool", "dict"):
+        try:
+            rows = issue_rows(json.loads(content))
+        except (ValueError, TypeError):
+            rows = None
+    return {"role": role, "name": name, "content": content, "size": len(content), "rows": rows or None}
+
+
+def issue_rows(payload):
+    """Table rows for the errors/warnings lists of an analyzer result, groups or single entries"""
+    if not isinstance(payload, dict):
+        return []
+    rows = []
+    for kind, level in (("errors", "ERROR"), ("warnings", "WARNING")):
+        for item in payload.get(kind) or []:
+            if isinstance(item, dict):
+                rows.append({"level": level, **{column: item[column] for column in ISSUE_COLUMNS if column in item}})
+    return rows
+
+
+def result_views(result, key):
+    """Message views of ``result``, built on first render and reused by later reruns"""
+    cached = st.session_state.views.get(key)
+    if cached is None or cached[0] is not result:
+        cached = st.session_state.views[key] = (result, [message_view(message) for message in result["messages"]])
+    return cached[1]
+
+
+def paginate(items, page_size, key, label="Page"):
+    """The current page of ``items``, chosen with a page selector when there is more than one"""
+    pages = max(1, math.ceil(len(items) / page_size))
+    page = st.number_input(label, min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    return items[(page - 1) * page_size:page * page_size], page, pages
+
+
+def display_issue_table(rows, key):
+    """Errors and warnings as a paginated table, filtered by level and component"""
+    levels = sorted({row["level"] for row in rows})
+    components = sorted({str(row.get("component", "")) for row in rows})
+    cols = st.columns(2)
+    selected_levels = cols[0].multiselect("Level", levels, default=levels, key=f"{key}_levels")
+    selected_components = cols[1].multiselect("Component", components, placeholder="All components",
+                                              key=f"{key}_components")
+    wanted = set(selected_components)
+    filtered = [row for row in rows
+                if row["level"] in selected_levels and (not wanted or str(row.get("component", "")) in wanted)]
+    page_rows, page, pages = paginate(filtered, ISSUES_PER_PAGE, f"{key}_page")
+    st.dataframe(page_rows, use_container_width=True, hide_index=True)
+    st.caption(f"{len(filtered)} of {len(rows)} issues · page {page} of {pages}")
+
+
+def display_message(view, key):
+    if view["role"] == "Human":
+        st.info(f"👤 **User:** {view['content']}")
+    elif view["role"] == "AI":
+        st.success(f"🤖 **AI:** {view['content']}")
+    elif view["role"] in ("Tool", "dict"):
+        # Payloads stay collapsed; nothing is sent to the browser until asked for
+        label = view["name"] if view["role"] == "Tool" else "Message"
+        details = f"{view['size']:,} characters" + (f", {len(view['rows'])} issues" if view["rows"] else "")
+        st.warning(f"🛠️ **{label}** ({details})")
+        if st.toggle("Show payload", key=f"{key}_show"):
+            if view["rows"]:
+                display_issue_table(view["rows"], key)
+            else:
+                st.code(view["content"][:MAX_PAYLOAD_CHARS])
+                if view["size"] > MAX_PAYLOAD_CHARS:
+                    st.caption(f"Showing the first {MAX_PAYLOAD_CHARS:,} characters.")
+                    st.download_button("Download full payload", view["content"], file_name=f"{key}.json",
+                                       key=f"{key}_download")
+    elif view["role"] == "other":
+        st.code(view["content"][:MAX_PAYLOAD_CHARS])
+    else:
+        st.write(f"📝 **{view['role']}:** {view['content']}")
+
+
+def display_results(result, key="result"):
+    """Display the agent results, one page of messages at a time"""
     st.subheader("🔍 Analysis Results")
 
     if not result:
@@ -25,76 +213,255 @@ def display_results(result):
         st.code(result.get("details", result["error"]))
         return
 
-    # Try to parse messages if they exist
     if isinstance(result, dict) and "messages" in result:
         st.subheader("💬 Conversation Messages")
+        views = result_views(result, key)
+        page_views, page, pages = paginate(views, MESSAGES_PER_PAGE, f"{key}_page", "Message page")
+        offset = (page - 1) * MESSAGES_PER_PAGE
+        for i, view in enumerate(page_views, offset):
+            display_message(view, f"{key}_{i}")
+        if pages > 1:
+            st.caption(f"{len(views)} messages · page {page} of {pages}")
+    else:
+        st.warning("⚠️ No conversation messages found in result")
 
-        messages = result["messages"]
-
-        for i, message in enumerate(messages):
-            # Handle different message formats
-            if hasattr(message, 'content'):
-                # LangChain message object
-                message_type = type(message).__name__
-                content = message.content
-
-                if 'Human' in message_type:
-                    st.info(f"👤 **User:** {content}")
-                elif 'AI' in message_type:
-                    st.success(f"🤖 **AI:** {content}")
-                elif 'Tool' in message_type:
-                    tool_name = getattr(message, 'name', 'Unknown Tool')
-                    st.warning(f"🛠️ **{tool_name}:** {content}")
-                else:
-                    st.write(f"📝 **{message_type}:** {content}")
+    if isinstance(result, dict) and result.get("timings"):
+        display_timings(result["timings"])
 
-            elif isinstance(message, dict):
-                # Dictionary format
-                st.json(message)
-            else:
-                # String or other format
-                st.code(str(message))
+
+def display_timings(timings):
+    """Break the request's wall time down into connection, LLM and tool stages"""
+    with st.expander("⏱️ Timing breakdown", expanded=False):
+        stages = {stage: timings[stage] for stage in ("mcp_connect", "mcp_startup", "load_tools", "llm") if stage in timings}
+        stages.update({f"tool: {name}": seconds for name, seconds in timings.get("tools", {}).items()})
+        agent = timings.get("agent", 0.0)
+        # Whatever the callbacks didn't see: graph overhead and message (de)serialization
+        stages["other"] = max(agent - timings.get("llm", 0.0) - sum(timings.get("tools", {}).values()), 0.0)
+        st.bar_chart({"seconds": stages}, horizontal=True)
+        cols = st.columns(3)
+        cols[0].metric("LLM turns", timings.get("llm_turns", 0))
+        cols[1].metric("Prompt size", f"~{timings.get('prompt_tokens', 0):,} tokens",
+                       help=f"{timings.get('prompt_bytes', 0):,} bytes")
+        cols[2].metric("Tool results", f"{timings.get('tool_result_bytes', 0):,} B")
+        digest = timings.get("prompt_digest")
+        if digest:
+            omitted = ", ".join(f"{count} {section}" for section, count in digest["omitted"].items()) or "nothing"
+            st.caption(f"Log digest: ~{digest['estimated_tokens']:,} of {digest['token_budget']:,} budgeted tokens, "
+                       f"{digest['included']} items included, omitted: {omitted}.")
+
+
+def display_metrics(metrics):
+    """Show latency and token spend of the last run, next to the last run of the other mode"""
+    st.subheader("⏱️ Latency & Tokens")
+    cols = st.columns(4)
+    cols[0].metric("Local rules", f"{metrics.get('local_seconds', 0.0):.3f} s")
+    cols[1].metric("LLM", f"{metrics.get('llm_seconds', 0.0):.2f} s")
+    cols[2].metric("Input tokens", metrics.get("input_tokens", 0))
+    cols[3].metric("Output tokens", metrics.get("output_tokens", 0))
+
+    st.session_state.mode_metrics[metrics["mode"]] = metrics
+    if len(st.session_state.mode_metrics) > 1:
+        st.caption("Last run per mode")
+        st.table(list(st.session_state.mode_metrics.values()))
+
+
+def display_local_results(result):
+    """Display rules-first results and the agent's answer for escalated issues"""
+    st.subheader("🔍 Analysis Results")
+    analysis = result["analysis"]
+    summary = analysis["summary"]
+
+    cols = st.columns(3)
+    cols[0].metric("Log entries", summary["total_logs"])
+    cols[1].metric("Errors", summary["error_count"])
+    cols[2].metric("Warnings", summary["warning_count"])
+
+    st.subheader("🛠️ Suggested Fixes")
+    for suggestion in result["suggestions"]:
+        st.write(suggestion)
+
+    with st.expander(f"📋 Grouped issues ({summary['distinct_errors']} errors, {summary['distinct_warnings']} warnings)"):
+        rows = issue_rows({kind: [{key: group[key] for key in ("component", "fingerprint", "count", "first_seen", "last_seen")}
+                                  for group in analysis[kind]] for kind in ("errors", "warnings")})
+        if rows:
+            display_issue_table(rows, "local_groups")
+
+    if analysis.get("stack_traces"):
+        with st.expander(f"🧵 Stack trace groups ({len(analysis['stack_traces'])})"):
+            st.dataframe([{"count": group["count"], "exception": group["exception_type"],
+                           "root cause": group["root_cause"] or "", "top frames": " < ".join(group["top_frames"]),
+                           "components": ", ".join(group["components"])} for group in analysis["stack_traces"]],
+                         use_container_width=True, hide_index=True)
+
+    escalated = result["metrics"]["escalated_issues"]
+    if result["escalation"] is not None:
+        st.markdown(f"**🤖 {escalated} issue group(s) had no specific rule and were sent to the agent:**")
+        display_results(result["escalation"], key="escalation")
+    elif escalated:
+        st.info(f"ℹ️ {escalated} issue group(s) only matched the generic rules.")
     else:
-        st.warning("⚠️ No conversation messages found in result")
+        st.success("✅ Every issue matched a specific rule, no LLM call was needed.")
+
+
+def failed_result(result):
+    """Agent errors, including a failed escalation of a local run, must not be cached and replayed."""
+    if not isinstance(result, dict):
+        return False
+    escalation = result.get("escalation")
+    return "error" in result or (isinstance(escalation, dict) and "error" in escalation)
+
+
+@st.fragment
+def display_result_view():
+    """
+    Results of the last analysis of this upload.
+
+    A fragment, so paging, filtering and opening payloads rerun only this view.
+    """
+    result = st.session_state.result
+    if isinstance(result, dict) and result.get("mode") == "local":
+        display_local_results(result)
+    else:
+        display_results(result)
+    if isinstance(result, dict) and "metrics" in result:
+        display_metrics(result["metrics"])
 
 
-uploaded_file = st.file_uploader('Upload a log file', type='json')
+uploaded_file = st.file_uploader('Upload a log file', type=['json', 'ndjson', 'jsonl', 'gz', 'zst'])
 
 if uploaded_file:
-    content = uploaded_file.read().decode("utf-8")
+    with uploaded_file.getbuffer() as view:
+        content_hash = hashlib.sha256(view).hexdigest()
     st.success("✅ File uploaded successfully")
 
-    # Show preview of logs
+    # Parse once while streaming; count and preview come from the same pass
+    batch = None
     try:
-        logs = json.loads(content)
-        st.info(f"📊 Found {len(logs)} log entries")
+        batch, preview = load_upload(content_hash, uploaded_file)
+        st.info(f"📊 Found {len(batch)} log entries")
 
         with st.expander("👀 Preview logs"):
-            st.json(logs[:2])  # Show first 2 entries
-    except:
-        st.error("❌ Invalid JSON format")
+            st.json(preview)
+    except Exception as e:
+        st.error(f"❌ Invalid log file: {e}")
 
-    if st.button("🧪 Analyze Log File"):
+    if batch is not None:
+        with st.expander("🕒 Time window drill-down"):
+            display_time_drilldown(get_log_index(content_hash, batch))
+
+    mode = st.radio(
+        "Analysis mode",
+        ["Local rules (escalate unknown issues to the agent)", "Agent (LLM)"],
+        help="Local mode answers from the analyzer rules in-process and only sends issues without a specific rule to the LLM."
+    )
+
+    if batch is not None and st.button("🧪 Analyze Log File"):
         with st.spinner("🔄 Running analysis..."):
             try:
-                from streamlit_client import run_agent
+                from analyzer import RULES_VERSION
+                from result_cache import library_versions
 
-                logs = json.loads(content)
+                # Identical uploads analyzed with the same mode, rule set and libraries are served from disk
+                cache = get_result_cache()
+                cache_key = cache.key(content_hash.encode(), mode, RULES_VERSION, library_versions())
+                result = cache.get(cache_key)
+                cached = result is not None
 
-                # Run the agent
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(run_agent(logs))
-                loop.close()
+                if not cached and mode.startswith("Local"):
+                    # The rules run in-process on the batch parsed for the preview
+                    result = get_session_pool().analyze_local(batch=batch)
+                elif not cached:
+                    # Hand the MCP server a file path so the logs never travel through the prompt.
+                    # The upload is copied as is (still compressed); the server streams it.
+                    suffix = os.path.splitext(uploaded_file.name)[1] or ".json"
+                    with tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False) as tmp:
+                        uploaded_file.seek(0)
+                        shutil.copyfileobj(uploaded_file, tmp)
+                        log_path = tmp.name
 
-                st.success("✅ Analysis complete!")
+                    # Run the agent over the persistent MCP session
+                    try:
+                        result = get_session_pool().analyze(path=log_path, batch=batch)
+                    finally:
+                        os.remove(log_path)
 
-                # Store and display results
+                if not cached:
+                    if not failed_result(result):
+                        cache.set(cache_key, result)
+                    st.success("✅ Analysis complete!")
+                else:
+                    st.success("⚡ Analysis complete! (served from cache)")
+
+                # Store the results; they are displayed below on this and every later rerun
                 st.session_state.result = result
-                display_results(result)
+                st.session_state.result_hash = content_hash
 
             except Exception as e:
                 st.error(f"❌ Analysis failed: {str(e)}")
                 import traceback
 
-                st.code(traceback.format_exc())
\ No newline at end of file
+                st.code(traceback.format_exc())
+
+    if st.session_state.result is not None and st.session_state.get("result_hash") == content_hash:
+        display_result_view()
+
+
+def display_follow_view(path):
+    """Poll a followed log file and show running totals plus what arrived since the last poll"""
+    from analyzer import LogTailer
+
+    tailer = st.session_state.tailers.get(path)
+    if tailer is None:
+        tailer = st.session_state.tailers[path] = LogTailer(path)
+
+    try:
+        update = tailer.poll()
+    except OSError as e:
+        st.error(f"❌ Cannot read {path}: {e}")
+        return
+
+    summary = update["summary"]
+    new = update["delta"]["summary"]
+    cols = st.columns(3)
+    cols[0].metric("Log entries", summary["total_logs"], delta=new["total_logs"])
+    cols[1].metric("Errors", summary["error_count"], delta=new["error_count"], delta_color="inverse")
+    cols[2].metric("Warnings", summary["warning_count"], delta=new["warning_count"], delta_color="inverse")
+    st.caption(f"Offset {update['offset']} bytes · {update['rotations']} rotation(s) · "
+               f"{update['invalid_lines']} invalid line(s)")
+
+    groups = tailer.result()
+    for kind in ("errors", "warnings"):
+        if groups[kind]:
+            st.markdown(f"**{kind.capitalize()}**")
+            st.dataframe(sorted(
+                ({key: group[key] for key in ("component", "fingerprint", "count", "last_seen")} for group in groups[kind]),
+                key=lambda row: -row["count"]
+            ))
+
+
+st.divider()
+st.subheader("📡 Follow a Live Log File")
+follow_path = st.text_input("Path of an NDJSON log file on the server")
+follow_cols = st.columns(2)
+follow = follow_cols[0].toggle("Follow", value=False)
+refresh_seconds = follow_cols[1].slider("Refresh every (seconds)", 1, 60, 5)
+
+if follow and follow_path:
+    @st.fragment(run_every=refresh_seconds)
+    def follow_fragment():
+        display_follow_view(follow_path)
+
+    follow_fragment()
+
+
+st.divider()
+with st.expander("📈 Server metrics"):
+    st.caption("Start the app with LOG_ANALYZER_METRICS=1 to collect per-stage timings, rule hits and payload sizes.")
+    metrics_format = st.radio("Format", ["json", "prometheus"], horizontal=True)
+    if st.button("Fetch metrics"):
+        for server_name, text in get_session_pool().server_metrics(metrics_format).items():
+            st.markdown(f"**{server_name}**")
+            if metrics_format == "json":
+                st.json(text)
+            else:
+                st.code(text, language="text")
@@ -0,0 +1,64 @@
+"""
+Message fingerprints: occurrences of one problem must share a fingerprint whatever
+the numbers, units and IDs in them, so groups scale with distinct problems.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyzer  # noqa: E402
+from log_generator import FAMILIES, generate_logs  # noqa: E402
+
+SAME_PROBLEM = [
+    # Numbers with and without a unit, of any length
+    ["Timeout after 559ms", "Timeout after 3458ms", "Timeout after 30000ms", "Timeout after 12"],
+    # IDs that are all digits, mixed hex, hex letters only, or 0x values
+    ["Deadlock in transaction 1234567890", "Deadlock in transaction 3fa9c0d2e1",
+     "Deadlock in transaction ceafbeefde", "Deadlock in transaction 0x7ffd3a"],
+    # Letter-led IDs and IDs glued to a name with "_"
+    ["Failed to load user42abc", "Failed to load usr9x81kq"],
+    ["Batch job failed: daily_report_ab12cd34ef", "Batch job failed: daily_report_abcdefabcd",
+     "Batch job failed: daily_report_0000000042"],
+    ["Memory usage reached 85%", "Memory usage reached 9.5%"],
+    ["Request 550e8400-e29b-41d4-a716-446655440000 failed", "Request 123e4567-e89b-12d3-a456-426614174000 failed"],
+    ["Kafka broker 10.0.0.1 not available", "Kafka broker 10.12.255.7:9092 not available"],
+    ["Started at 2025-07-25T12:00:00Z", "Started at 2025-07-26 08:15:30.123+02:00"],
+]
+
+DIFFERENT_PROBLEMS = [
+    ("Payment failed with code E1001", "Payment failed with code E1002"),
+    ("Facade failed", "Decade failed"),
+    ("Connection refused", "Connection reset"),
+]
+
+
+def test_same_problem_same_fingerprint():
+    for messages in SAME_PROBLEM:
+        assert len({analyzer.fingerprint(message) for message in messages}) == 1, messages
+
+
+def test_distinct_problems_stay_apart():
+    for first, second in DIFFERENT_PROBLEMS:
+        assert analyzer.fingerprint(first) != analyzer.fingerprint(second)
+
+
+def test_placeholders():
+    assert analyzer.fingerprint("after 3458ms") == analyzer.fingerprint("after 559ms") == "after <num>"
+    assert analyzer.fingerprint("code E1001") == "code E1001"
+    assert analyzer.fingerprint("at Foo.java:42") == "at Foo.java:<num>"
+
+
+def test_generated_logs_group_per_template():
+    templates = {(level, component, message) for family in FAMILIES.values()
+                 for level, component, message, _ in family if level in ("ERROR", "WARNING")}
+    result = analyzer.LogBatch(generate_logs(30000, 0.5, seed=1)).result()
+    assert len(result["errors"]) + len(result["warnings"]) == len(templates)
+
+
+if __name__ == "__main__":
+    test_same_problem_same_fingerprint()
+    test_distinct_problems_stay_apart()
+    test_placeholders()
+    test_generated_logs_group_per_template()
+    print("fingerprints group by problem")
@@ -0,0 +1,51 @@
+"""
+A LogBatch is shared between threads (Streamlit's cache_resource, asyncio.to_thread),
+so its lazily built groups must never be visible half-built to another reader.
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyzer  # noqa: E402
+from log_generator import generate_logs  # noqa: E402
+
+THREADS = 4
+ROUNDS = 5
+
+
+def _read_concurrently(logs):
+    batch = analyzer.LogBatch(logs)
+    barrier = threading.Barrier(THREADS)
+    results = []
+
+    def read():
+        barrier.wait()
+        results.append((batch.summary(), batch.trace_groups().result()))
+
+    threads = [threading.Thread(target=read) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_readers_see_complete_groups():
+    logs = list(generate_logs(50000, 0.5, seed=7))
+    expected = analyzer.LogBatch(logs)
+    expected = (expected.summary(), expected.trace_groups().result())
+    interval = sys.getswitchinterval()
+    # Switch threads often so readers overlap the first build
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(ROUNDS):
+            assert _read_concurrently(logs) == [expected] * THREADS
+    finally:
+        sys.setswitchinterval(interval)
+
+
+if __name__ == "__main__":
+    test_concurrent_readers_see_complete_groups()
+    print("concurrent LogBatch readers agree")
@@ -0,0 +1,54 @@
+"""
+analyze_log_file returns a bounded result (summary and the largest groups); the
+rest is paged from the batch kept with the handle.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyzer  # noqa: E402
+from log_generator import generate_logs  # noqa: E402
+
+
+def _write(tmp_path, logs):
+    path = tmp_path / "logs.ndjson"
+    path.write_text("\n".join(json.dumps(log) for log in logs), encoding="utf-8")
+    return str(path)
+
+
+def test_result_is_bounded_and_pages_cover_every_group(tmp_path):
+    logs = list(generate_logs(5000, 0.3, seed=5))
+    # Many distinct messages that no placeholder folds together
+    logs += [{"level": "ERROR", "component": "Users", "message": f"user {name} not found",
+              "timestamp": "2025-07-26T12:00:00Z"} for name in ("alice", "bob", "carol", "dave", "erin") * 20]
+    path = _write(tmp_path, logs)
+    expected = analyzer.LogBatch(logs).result()
+    ranked = sorted(expected["errors"], key=lambda group: -group["count"])
+
+    result = analyzer.analyze_log_file(path, top_n=3)
+    assert result["summary"] == expected["summary"]
+    assert result["errors"] == ranked[:3]
+    assert len(result["warnings"]) == len(result["stack_traces"]) == 3
+    assert result["omitted"]["errors"] == len(ranked) - 3
+
+    pages, offset = [], 0
+    while True:
+        page = analyzer.get_log_file_groups(result["handle"], "errors", offset, 4)["errors"]
+        if not page:
+            break
+        pages += page
+        offset += len(page)
+    assert pages == ranked
+    traces = analyzer.get_log_file_groups(result["handle"], "stack_traces", 0, 1000)["stack_traces"]
+    assert traces == expected["stack_traces"]
+
+
+def test_issue_pages_match_the_file(tmp_path):
+    logs = list(generate_logs(2000, 0.5, seed=2))
+    path = _write(tmp_path, logs)
+    handle = analyzer.analyze_log_file(path)["handle"]
+    warnings = [analyzer.extract_issue(log)[1] for log in logs
+                if analyzer.extract_issue(log) and analyzer.extract_issue(log)[0] == "warnings"]
+    assert analyzer.get_log_file_issues(handle, "WARNING", 10, 25)["warnings"] == warnings[10:35]
@@ -0,0 +1,45 @@
+"""
+Timestamp parsing and time-window queries. parse_timestamp must give the same
+epoch seconds on every supported Python, including 3.10's stricter fromisoformat.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_index import LogIndex, parse_timestamp  # noqa: E402
+
+# 2025-07-25T10:34:56Z
+EPOCH = 1753439696
+
+
+@pytest.mark.parametrize("value", [
+    "2025-07-25T10:34:56Z",
+    "2025-07-25T10:34:56",
+    "2025-07-25 10:34:56.12",
+    "2025-07-25T10:34:56.123Z",
+    "2025-07-25T10:34:56.1234z",
+    "2025-07-25T12:34:56.1+02:00",
+    "2025-07-25T12:34:56.1234+02:00",
+    "2025-07-25T12:34:56.123456789+02:00",
+    "2025-07-25T12:34:56,5+0200",
+    "2025-07-25T12:34:56+0200",
+    "2025-07-25T05:34:56.12345-05:00",
+    "2025-07-25T10:34:56Z[UTC]",
+])
+def test_parse_timestamp_keeps_the_offset(value):
+    assert parse_timestamp(value) == EPOCH
+
+
+@pytest.mark.parametrize("value", ["", "not a time", "2025-07-25T12:34:56.12+02:00 trailing"])
+def test_parse_timestamp_rejects(value):
+    assert parse_timestamp(value) is None
+
+
+def test_window_end_must_follow_start():
+    index = LogIndex([{"timestamp": "2025-07-25T10:34:56Z", "level": "ERROR", "component": "A"}])
+    assert index.query()["counts"] == {"total": 1, "errors": 1, "warnings": 0}
+    with pytest.raises(ValueError, match="Invalid window"):
+        index.query(EPOCH, EPOCH)
@@ -0,0 +1,51 @@
+"""
+Streaming reader: any chunking gives the same entries, and invalid JSON fails at
+once with its position in the stream instead of buffering the rest of the file.
+"""
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_stream import iter_log_entries  # noqa: E402
+
+LOGS = [{"timestamp": "2025-07-26T12:30:01Z", "level": "ERROR", "message": 'quote " and é ' + "x" * i,
+         "retries": -12.5e3, "ok": True, "user": None, "stack_trace": "at A.b(A.java:1)\n" * (i % 4)}
+        for i in range(30)]
+
+
+class CountingStream(io.StringIO):
+    """Records how much of the stream was read."""
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed = self.tell()
+        return chunk
+
+
+@pytest.mark.parametrize("text", [json.dumps(LOGS), json.dumps(LOGS, indent=2),
+                                  "\n".join(json.dumps(log) for log in LOGS)])
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 65536])
+def test_any_chunking_gives_the_same_entries(text, chunk_size):
+    assert list(iter_log_entries(io.StringIO(text), chunk_size)) == LOGS
+
+
+def test_invalid_line_fails_early_with_its_position():
+    lines = [json.dumps(log) for log in LOGS]
+    text = "\n".join(lines[:3] + ['{"level": "ERROR", "message": oops}'] + lines * 200)
+    stream = CountingStream(text)
+    with pytest.raises(ValueError) as error:
+        list(iter_log_entries(stream, 256))
+    char = text.index("oops")
+    assert f"line 4 column {char - text.rfind(chr(10), 0, char)} (char {char})" in str(error.value)
+    assert stream.consumed < char + 1024
+
+
+@pytest.mark.parametrize("text", ['{"a": "unterminated', '{"a": 1} x', '[{"a": 1},\n  {"a": tru}]'])
+def test_invalid_json_at_the_end(text):
+    with pytest.raises(ValueError, match="Invalid JSON log entry"):
+        list(iter_log_entries(io.StringIO(text), 4))
@@ -0,0 +1,9 @@
+import streamlit as st
+
+
+@st.cache_resource
+def get_session_pool():
+    """One MCP session pool per Streamlit server process, shared by all reruns, users and pages."""
+    from streamlit_client import MCPSessionPool
+
+    return MCPSessionPool()
@@ -0,0 +1,271 @@
+"""
+Warm LogAnalyzer MCP server on a local socket.
+
+Launching analyzer.py per analysis pays for importing the MCP server stack
+(and, through ``mcp run``, its CLI) before ``initialize`` is answered. This
+server imports the analyzer and compiles the suggestion rules once, then
+pre-forks ``--workers`` processes that inherit that state and serve MCP
+sessions over a Unix socket or a loopback TCP port; a worker that exits is
+replaced by a fresh fork of the warm parent. Log-file handles and indexes are
+kept per worker for the lifetime of the server rather than per analysis.
+
+Clients connect with ``socket_client`` (an ``mcpServers`` entry with a
+``socket`` address), or through ``--bridge``, a stdio MCP server that only
+relays bytes to the warm server and so starts without importing anything
+heavy. The bridge serves the analyzer in-process if the warm server is down.
+
+    python warm_server.py                                  # 127.0.0.1:8765, LOG_ANALYZER_WARM_ADDRESS
+    python warm_server.py --address unix:/tmp/loganalyzer.sock --workers 4
+    python warm_server.py --bridge                         # stdio, e.g. as the command in mcp_config.json
+
+There is no authentication, so only Unix sockets (created owner-only) and
+loopback addresses are accepted. Forking needs a POSIX system; elsewhere a
+single process serves every session.
+"""
+import argparse
+import ipaddress
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+from contextlib import asynccontextmanager
+from typing import Tuple, Union
+
+DEFAULT_ADDRESS = os.getenv("LOG_ANALYZER_WARM_ADDRESS", "127.0.0.1:8765")
+DEFAULT_WORKERS = int(os.getenv("LOG_ANALYZER_WARM_WORKERS", "2"))
+# Longest JSON-RPC message (one line) accepted from a socket, e.g. analyze_logs with inline logs
+MAX_MESSAGE_BYTES = 1 << 28
+RELAY_CHUNK = 1 << 16
+
+
+def parse_address(address: str) -> Tuple[str, Union[str, Tuple[str, int]]]:
+    """("unix", path) for "unix:/path/to.sock", ("tcp", (host, port)) for "host:port" on a loopback host."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"Refusing non-local address {address}: the warm server has no authentication.")
+    return "tcp", (host, int(port))
+
+
+def bind(address: str) -> socket.socket:
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        family = socket.AF_INET6 if ":" in target[0] else socket.AF_INET
+        return socket.create_server(target, family=family)
+    if os.path.exists(target):
+        os.remove(target)  # left behind by a server that was killed
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        sock.bind(target)
+    finally:
+        os.umask(umask)
+    sock.listen()
+    return sock
+
+
+def connect(address: str) -> socket.socket:
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        return socket.create_connection(target)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(target)
+    return sock
+
+
+async def _open_connection(address: str):
+    import asyncio
+
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        return await asyncio.open_connection(*target, limit=MAX_MESSAGE_BYTES)
+    return await asyncio.open_unix_connection(target, limit=MAX_MESSAGE_BYTES)
+
+
+class _LineReader:
+    """Text lines of a socket, in the shape mcp's stdio_server expects of stdin."""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        line = await self.reader.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line.decode("utf-8")
+
+
+class _LineWriter:
+    """A socket in the shape mcp's stdio_server expects of stdout."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    async def write(self, text: str) -> None:
+        self.writer.write(text.encode("utf-8"))
+
+    async def flush(self) -> None:
+        await self.writer.drain()
+
+
+def warm_up():
+    """Import the analyzer and the MCP server stack and compile the rules; returns the FastMCP server."""
+    import mcp.server.stdio  # noqa: F401
+    import analyzer
+
+    analyzer.compiled_rules()
+    return analyzer.mcp
+
+
+async def _serve_connection(reader, writer) -> None:
+    """One MCP session per connection, exactly as FastMCP serves stdio."""
+    from mcp.server.stdio import stdio_server
+
+    server = warm_up()._mcp_server
+    try:
+        async with stdio_server(_LineReader(reader), _LineWriter(writer)) as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    except Exception:
+        traceback.print_exc()
+    finally:
+        writer.close()
+
+
+def _serve_forever(sock: socket.socket) -> None:
+    import asyncio
+
+    async def main():
+        if sock.family == getattr(socket, "AF_UNIX", None):
+            server = await asyncio.start_unix_server(_serve_connection, sock=sock, limit=MAX_MESSAGE_BYTES)
+        else:
+            server = await asyncio.start_server(_serve_connection, sock=sock, limit=MAX_MESSAGE_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def serve(address: str = DEFAULT_ADDRESS, workers: int = DEFAULT_WORKERS) -> None:
+    """Warm up, then serve on ``address`` from ``workers`` forked processes until interrupted."""
+    sock = bind(address)
+    warm_up()
+    print(f"🔥 LogAnalyzer warm server on {address} ({workers} worker(s))", file=sys.stderr, flush=True)
+    if workers <= 1 or not hasattr(os, "fork"):
+        try:
+            _serve_forever(sock)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # SIGTERM unwinds through the finally below, so the workers don't outlive us
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    children = set()
+    try:
+        while True:
+            while len(children) < workers:
+                pid = os.fork()
+                if pid == 0:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    code = 0
+                    try:
+                        _serve_forever(sock)
+                    except KeyboardInterrupt:
+                        pass
+                    except BaseException:
+                        traceback.print_exc()
+                        code = 1
+                    finally:
+                        os._exit(code)
+                children.add(pid)
+            pid, _ = os.wait()
+            children.discard(pid)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def bridge(address: str = DEFAULT_ADDRESS) -> None:
+    """
+    Relay this process's stdio to the warm server, for MCP clients that only launch stdio servers.
+
+    Only the standard library is imported on this path. If the warm server can't
+    be reached, the analyzer is served in-process over stdio instead.
+    """
+    try:
+        sock = connect(address)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warm server at {address} unavailable ({e}), starting the analyzer here", file=sys.stderr)
+        warm_up().run(transport="stdio")
+        return
+
+    def upstream():
+        try:
+            for chunk in iter(lambda: sys.stdin.buffer.read1(RELAY_CHUNK), b""):
+                sock.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    threading.Thread(target=upstream, name="warm-bridge", daemon=True).start()
+    stdout = sys.stdout.buffer
+    for chunk in iter(lambda: sock.recv(RELAY_CHUNK), b""):
+        stdout.write(chunk)
+        stdout.flush()
+    sock.close()
+
+
+@asynccontextmanager
+async def socket_client(address: str = DEFAULT_ADDRESS):
+    """
+    Client transport to a warm server: yields the (read, write) streams for an
+    mcp ClientSession, like mcp.client.stdio.stdio_client does for a subprocess.
+
+    Both ends of the socket frame messages as JSON lines, so the client reuses
+    mcp's stdio transport over the socket, the same way the server does.
+    """
+    from mcp.server.stdio import stdio_server
+
+    reader, writer = await _open_connection(address)
+    try:
+        async with stdio_server(_LineReader(reader), _LineWriter(writer)) as streams:
+            try:
+                yield streams
+            finally:
+                # EOF ends the transport's reader task, which would otherwise wait for the server
+                writer.close()
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the LogAnalyzer MCP tools from warm, pre-forked processes.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help='"host:port" on loopback or "unix:/path/to.sock"')
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Pre-forked worker processes (POSIX)")
+    parser.add_argument("--bridge", action="store_true", help="Run as a stdio MCP server relaying to the warm server")
+    args = parser.parse_args(argv)
+
+    if args.bridge:
+        bridge(args.address)
+    else:
+        serve(args.address, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())